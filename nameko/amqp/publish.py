@@ -1,50 +1,110 @@
+import socket
+import time
 import warnings
-from contextlib import contextmanager
+from collections.abc import Mapping
+from functools import lru_cache
+from itertools import islice
+from types import MappingProxyType
 
-from kombu import Connection
+from kombu import Connection, Producer
 from kombu.exceptions import ChannelError
 from kombu.pools import connections, producers
 
 from nameko.constants import DEFAULT_RETRY_POLICY, DEFAULT_TRANSPORT_OPTIONS, PERSISTENT
 
 
+_EMPTY_HEADERS = MappingProxyType({})
+
+
 class UndeliverableMessage(Exception):
     """当启用了发布者确认并且消息无法路由或持久存储时抛出的异常。"""
 
     pass
 
 
-@contextmanager
-def get_connection(amqp_uri, ssl=None, login_method=None, transport_options=None):
-    if not transport_options:
-        transport_options = DEFAULT_TRANSPORT_OPTIONS.copy()
-    conn = Connection(
+class PublishConfirmTimeout(Exception):
+    """当 :meth:`Publisher.publish_many` 在限定时间内未收到一批消息的发布确认时抛出的异常。"""
+
+    pass
+
+
+def _freeze(value):
+    if isinstance(value, Mapping):
+        return frozenset(value.items())
+    return value
+
+
+@lru_cache(maxsize=128)
+def _get_cached_connection(amqp_uri, ssl, login_method, transport_options):
+    # 仅在缓存未命中时才复制（解冻）选项并构造 ``Connection`` 。
+    if isinstance(ssl, frozenset):
+        ssl = dict(ssl)
+    return Connection(
         amqp_uri,
-        transport_options=transport_options,
+        transport_options=dict(transport_options),
         ssl=ssl,
         login_method=login_method,
     )
 
-    with connections[conn].acquire(block=True) as connection:
-        yield connection
+
+def _get_connection(amqp_uri, ssl, login_method, transport_options):
+    """返回用作 kombu 连接池键的 ``Connection`` 。
+
+    相同的参数会复用同一个（从不真正建立连接的）实例，避免每次发布都重新
+    解析 URI 并计算其哈希。若参数中含有不可哈希的值，则退回到每次新建。
+    """
+    try:
+        return _get_cached_connection(
+            amqp_uri, _freeze(ssl), login_method, _freeze(transport_options)
+        )
+    except TypeError:
+        return Connection(
+            amqp_uri,
+            transport_options=dict(transport_options),
+            ssl=ssl,
+            login_method=login_method,
+        )
+
+
+class _PooledResource(object):
+    """在进入时从 kombu 资源池获取资源、退出时归还的上下文管理器。
+
+    与 ``contextlib.contextmanager`` 相比，省去了每次发布时生成器的创建以及
+    ``send`` / ``throw`` 的调度。
+    """
+
+    __slots__ = ("pool", "resource")
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.resource = None
+
+    def __enter__(self):
+        self.resource = self.pool.acquire(block=True)
+        return self.resource.__enter__()
+
+    def __exit__(self, *exc_info):
+        return self.resource.__exit__(*exc_info)
+
+
+def get_connection(amqp_uri, ssl=None, login_method=None, transport_options=None):
+    if not transport_options:
+        transport_options = DEFAULT_TRANSPORT_OPTIONS
+    conn = _get_connection(amqp_uri, ssl, login_method, transport_options)
+
+    return _PooledResource(connections[conn])
 
 
-@contextmanager
 def get_producer(
     amqp_uri, confirms=True, ssl=None, login_method=None, transport_options=None
 ):
     if transport_options is None:
-        transport_options = DEFAULT_TRANSPORT_OPTIONS.copy()
-    transport_options["confirm_publish"] = confirms
-    conn = Connection(
-        amqp_uri,
-        transport_options=transport_options,
-        ssl=ssl,
-        login_method=login_method,
-    )
+        transport_options = DEFAULT_TRANSPORT_OPTIONS
+    if transport_options.get("confirm_publish") != confirms:
+        transport_options = dict(transport_options, confirm_publish=confirms)
+    conn = _get_connection(amqp_uri, ssl, login_method, transport_options)
 
-    with producers[conn].acquire(block=True) as producer:
-        yield producer
+    return _PooledResource(producers[conn])
 
 
 class Publisher(object):
@@ -111,6 +171,13 @@ class Publisher(object):
     参见 :attr:`self.retry` 。
     """
 
+    confirm_timeout = 30
+    """
+    :meth:`publish_many` 等待每批消息发布确认的最长秒数，超时后抛出 :class:`PublishConfirmTimeout` 。
+
+    设为 ``None`` 则一直等待。
+    """
+
     declare = []
     """
     在发布消息前需要（重新）声明的 Kombu 对象，如 :class:`~kombu.messaging.Queue` 或 :class:`~kombu.messaging.Exchange` 。
@@ -170,32 +237,71 @@ class Publisher(object):
         # 其他发布参数
         self.publish_kwargs = publish_kwargs
 
-    def publish(self, payload: dict, **kwargs):
-        """发布一条消息"""
-        publish_kwargs = self.publish_kwargs.copy()
-
+    def _get_transport_options(self, use_confirms):
+        """返回默认传输选项加上 ``confirm_publish`` 后的只读副本。
+
+        两个副本（确认与非确认）只在 ``transport_options`` 的内容变化时重新构造，
+        既避免每次发布都复制字典，也不会修改共享的默认值。
+        """
+        cached = self.__dict__.get("_confirm_transport_options")
+        if cached is None or cached[0] != self.transport_options:
+            source = dict(self.transport_options)
+            cached = self._confirm_transport_options = (
+                source,
+                {
+                    confirms: MappingProxyType(dict(source, confirm_publish=confirms))
+                    for confirms in (True, False)
+                },
+            )
+        return cached[1][use_confirms]
+
+    def _get_publish_options(self, kwargs):
+        """解析一次发布所用的确认开关、传输选项以及传给 kombu 的发布参数。"""
         # 合并发布者实例化时的头信息与现在提供的任何头信息；“额外”的头信息总是优先。
-        headers = publish_kwargs.pop("headers", {}).copy()
-        headers.update(kwargs.pop("headers", {}))
-        headers.update(kwargs.pop("extra_headers", {}))
-
-        use_confirms = kwargs.pop("use_confirms", self.use_confirms)
-        transport_options = kwargs.pop("transport_options", self.transport_options)
-        transport_options["confirm_publish"] = use_confirms
-
-        delivery_mode = kwargs.pop("delivery_mode", self.delivery_mode)
-        mandatory = kwargs.pop("mandatory", self.mandatory)
-        priority = kwargs.pop("priority", self.priority)
-        expiration = kwargs.pop("expiration", self.expiration)
-        serializer = kwargs.pop("serializer", self.serializer)
-        compression = kwargs.pop("compression", self.compression)
-        retry = kwargs.pop("retry", self.retry)
-        retry_policy = kwargs.pop("retry_policy", self.retry_policy)
+        # 只构造一次合并后的字典；缺省值使用共享的只读空映射。
+        headers = {
+            **self.publish_kwargs.get("headers", _EMPTY_HEADERS),
+            **kwargs.pop("headers", _EMPTY_HEADERS),
+            **kwargs.pop("extra_headers", _EMPTY_HEADERS),
+        }
+
+        use_confirms = bool(kwargs.pop("use_confirms", self.use_confirms))
+        transport_options = kwargs.pop("transport_options", None)
+        if transport_options is None:
+            transport_options = self._get_transport_options(use_confirms)
+        else:
+            transport_options = dict(transport_options, confirm_publish=use_confirms)
+
+        # 没有额外声明时（最常见的情况）直接复用实例的列表，否则一次性拼接
+        extra_declare = kwargs.pop("declare", None)
+        if extra_declare is None:
+            declare = self.declare
+        else:
+            declare = [*self.declare, *extra_declare]
+
+        publish_kwargs = {
+            "delivery_mode": self.delivery_mode,
+            "mandatory": self.mandatory,
+            "priority": self.priority,
+            "expiration": self.expiration,
+            "serializer": self.serializer,
+            "compression": self.compression,
+            "retry": self.retry,
+            "retry_policy": self.retry_policy,
+            **self.publish_kwargs,
+            **kwargs,  # 剩余的在发布时传递的关键字参数优先。
+            "headers": headers,
+            "declare": declare,
+        }
+
+        return use_confirms, transport_options, publish_kwargs
 
-        declare = self.declare[:]
-        declare.extend(kwargs.pop("declare", ()))
-
-        publish_kwargs.update(kwargs)  # 剩余的在发布时传递的关键字参数优先。
+    def publish(self, payload: dict, **kwargs):
+        """发布一条消息"""
+        use_confirms, transport_options, publish_kwargs = self._get_publish_options(
+            kwargs
+        )
+        mandatory = publish_kwargs["mandatory"]
 
         with get_producer(
             self.amqp_uri,
@@ -205,20 +311,7 @@ class Publisher(object):
             transport_options,
         ) as producer:
             try:
-                producer.publish(
-                    payload,
-                    headers=headers,
-                    delivery_mode=delivery_mode,
-                    mandatory=mandatory,
-                    priority=priority,
-                    expiration=expiration,
-                    compression=compression,
-                    declare=declare,
-                    retry=retry,
-                    retry_policy=retry_policy,
-                    serializer=serializer,
-                    **publish_kwargs,
-                )
+                producer.publish(payload, **publish_kwargs)
             except ChannelError as exc:
                 if "NO_ROUTE" in str(exc):
                     raise UndeliverableMessage()
@@ -231,3 +324,108 @@ class Publisher(object):
                         "unroutable messages cannot be detected without "
                         "publish confirms enabled."
                     )
+
+    def publish_many(self, payloads, batch=64, **kwargs):
+        """发布多条消息，并按批次等待发布确认。
+
+        所有消息共用同一个通道。启用确认时，每发布 ``batch`` 条消息后才统一等待一次代理的确认，
+        把确认往返的开销分摊到整批消息上。被代理拒绝（``basic.nack``）的消息在该批确认完成后，
+        会改用 :meth:`publish` 逐条重新发布，每条消息单独同步等待确认（并按 :attr:`retry` 重试），
+        因此重试部分不享受批量确认的开销分摊。
+
+        其余关键字参数与 :meth:`publish` 相同，并应用到每一条消息。批次内不会自动重试，
+        以免在新通道上丢失尚未确认的消息；连接错误将直接抛出。
+        ``confirm_timeout`` 可覆盖 :attr:`confirm_timeout` 。
+        """
+        if batch < 1:
+            raise ValueError("`batch` must be at least 1, got {!r}".format(batch))
+
+        confirm_timeout = kwargs.pop("confirm_timeout", self.confirm_timeout)
+
+        if not kwargs.get("use_confirms", self.use_confirms):
+            for payload in payloads:
+                self.publish(payload, **kwargs)
+            return
+
+        # 底层通道不启用 kombu 的逐条确认，由本方法自行选择确认模式并等待
+        publish_options = dict(kwargs, use_confirms=False)
+        _, transport_options, publish_kwargs = self._get_publish_options(
+            publish_options
+        )
+        publish_kwargs["retry"] = False
+
+        pending = {}
+        nacked = []
+
+        def settle(delivery_tag, multiple):
+            if multiple:
+                tags = [tag for tag in pending if tag <= delivery_tag]
+            else:
+                tags = [delivery_tag]
+            return [pending.pop(tag) for tag in tags if tag in pending]
+
+        def on_ack(delivery_tag, multiple):
+            settle(delivery_tag, multiple)
+
+        def on_nack(delivery_tag, multiple):
+            nacked.extend(settle(delivery_tag, multiple))
+
+        payloads = iter(payloads)
+
+        with get_connection(
+            self.amqp_uri, self.ssl, self.login_method, transport_options
+        ) as connection:
+            channel = connection.channel()
+            failed = True
+            try:
+                channel.events["basic_ack"].add(on_ack)
+                channel.events["basic_nack"].add(on_nack)
+                channel.confirm_select()
+                producer = Producer(channel)
+
+                delivery_tag = 0
+                chunk = list(islice(payloads, batch))
+                while chunk:
+                    for payload in chunk:
+                        delivery_tag += 1
+                        pending[delivery_tag] = payload
+                        producer.publish(payload, **publish_kwargs)
+
+                    self._wait_for_confirms(connection, pending, confirm_timeout)
+
+                    for payload in nacked:
+                        self.publish(payload, **kwargs)
+                    del nacked[:]
+
+                    chunk = list(islice(payloads, batch))
+                failed = False
+            except ChannelError as exc:
+                if "NO_ROUTE" in str(exc):
+                    raise UndeliverableMessage()
+                raise
+            finally:
+                try:
+                    channel.close()
+                except Exception:
+                    # 出错后通道可能已经损坏，关闭时的错误不能掩盖正在抛出的原始异常
+                    if not failed:
+                        raise
+
+    @staticmethod
+    def _wait_for_confirms(connection, pending, timeout):
+        # 每批消息单独计时；代理迟迟不确认时抛出异常，而不是让调用者无限期阻塞
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while pending:
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PublishConfirmTimeout(
+                        "{} message(s) not confirmed after {}s".format(
+                            len(pending), timeout
+                        )
+                    )
+            try:
+                connection.drain_events(timeout=remaining)
+            except socket.timeout:
+                pass
@@ -1,18 +1,28 @@
-from __future__ import print_function
+from __future__ import annotations, print_function
 
 import argparse
 import os
 import re
+import sys
 from functools import partial
 
 import yaml
-from pkg_resources import get_distribution
 
 from nameko.exceptions import CommandError, ConfigurationError
 
 from . import commands
 
 
+try:
+    from importlib.metadata import version as get_version
+except ImportError:  # pragma: no cover
+    # python < 3.8
+    from pkg_resources import get_distribution
+
+    def get_version(name):
+        return get_distribution(name).version
+
+
 try:
     import regex
 except ImportError:  # pragma: no cover
@@ -83,11 +93,21 @@ RECURSIVE_ENV_VAR_MATCHER = re.compile(
 # - **RECURSIVE_ENV_VAR_MATCHER**：定义了一个正则表达式，用于匹配嵌套的环境变量格式。它可以匹配形式如 `${...}`，并且支持在 `${...}` 结构内存在额外的 `${...}` 结构。
 
 
+# 不含嵌套、默认值中也不含花括号的 `${NAME:default}`。它是 `regex`
+# 递归模式的子集：每个 `{` 都属于某个匹配时，两者的替换结果相同。
+FLAT_ENV_VAR_MATCHER = re.compile(r"\$\{([^{}:\s]+)(?::([^{}]*))?\}")
+
+# 预先绑定的方法对象，避免在每个 YAML 标量上重复查找属性
+_sub_env_vars = ENV_VAR_MATCHER.sub
+_subn_env_vars = ENV_VAR_MATCHER.subn
+_subn_flat_env_vars = FLAT_ENV_VAR_MATCHER.subn
+
+
 def setup_parser():
     """启动时，设置 argparser 以及定义的命令行"""
     parser = argparse.ArgumentParser()
     parser.add_argument(
-        "-v", "--version", action="version", version=get_distribution("nameko").version
+        "-v", "--version", action="version", version=get_version("nameko")
     )
     subparsers = parser.add_subparsers()
 
@@ -102,7 +122,7 @@ def setup_parser():
     return parser
 
 
-def _replace_env_var(match: regex.Match):
+def _replace_env_var(match: re.Match | regex.Match):
     env_var, default = match.groups()
     value = os.environ.get(env_var, None)
     if value is None:
@@ -112,8 +132,13 @@ def _replace_env_var(match: regex.Match):
             default = ""
 
         value = default
-        while IMPLICIT_ENV_VAR_MATCHER.match(value):  # pragma: no cover
-            value = ENV_VAR_MATCHER.sub(_replace_env_var, value)  # type: ignore
+        # 反复展开直到不再发生替换（不动点），每轮只需扫描一次；
+        # 不含 `${` 的默认值（最常见的情况）完全不进入正则引擎
+        while "${" in value:
+            expanded, count = _subn_env_vars(_replace_env_var, value)
+            if not count or expanded == value:
+                break
+            value = expanded
     return value
 
 
@@ -123,12 +148,25 @@ def env_var_constructor(loader: yaml.SafeLoader, node: yaml.Node, raw: bool = Fa
 
     raw_value = loader.construct_scalar(node)
 
+    # 不含变量的标量（例如显式标记为 `!env_var` 的普通字符串）无需进入正则引擎；
+    # 与未发生替换时一样，原样返回
+    if "${" not in raw_value:
+        return raw_value
+
     # 检测并对递归环境变量报错
     if not has_regex_module and RECURSIVE_ENV_VAR_MATCHER.match(
         raw_value
     ):  # pragma: no cover
         raise ConfigurationError("嵌套的环境变量查找需要使用 `regex` 模块。")
-    value = ENV_VAR_MATCHER.sub(_replace_env_var, raw_value)  # type: ignore
+
+    if has_regex_module:
+        # 大多数标量只包含扁平的变量：先用扁平的 `re` 模式替换，仅当存在
+        # 不属于任何扁平匹配的 `{` （嵌套或默认值中含花括号）时才回退到递归模式
+        value, count = _subn_flat_env_vars(_replace_env_var, raw_value)
+        if count != raw_value.count("{"):
+            value = _sub_env_vars(_replace_env_var, raw_value)
+    else:  # pragma: no cover
+        value = _sub_env_vars(_replace_env_var, raw_value)
     if value == raw_value:
         return value  # avoid recursion
     return value if raw else yaml.safe_load(value)
@@ -146,8 +184,7 @@ def setup_yaml_parser():
 
 def main():
     parser = setup_parser()
-    args, unknown_args = parser.parse_known_args()
-    print(f"{args = }")
+    args, unknown_args = parser.parse_known_args(sys.argv[1:])
     setup_yaml_parser()
     try:
         args.main(args, *unknown_args)
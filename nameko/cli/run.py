@@ -1,17 +1,14 @@
 from __future__ import print_function
 
 import errno
-import inspect
 import logging
 import logging.config
 import argparse
 import os
-import re
 import signal
 import sys
-from typing import List, Optional, Any, Type
+from typing import List, Optional, Type
 
-import six
 import yaml
 import eventlet
 from eventlet import backdoor
@@ -24,17 +21,18 @@ from nameko.runners import ServiceRunner
 
 logger = logging.getLogger(__name__)
 
-MISSING_MODULE_TEMPLATE = "^No module named '?{}'?$"
 
+def has_entrypoints(cls: Type):
+    """判断某个类（包括其基类）是否声明了入口点
 
-def is_type(obj: Any):
-    """判断某个未知对象是否为 类"""
-    return isinstance(obj, six.class_types)
-
-
-def is_entrypoint(method: Any):
-    """判断某个函数是否为入口点"""
-    return hasattr(method, ENTRYPOINT_EXTENSIONS_ATTR)
+    直接遍历各个类的 ``__dict__`` ，而不是使用 ``inspect.getmembers`` ，
+    以免对无关的属性调用 ``getattr`` （从而触发描述符）并对结果排序。
+    """
+    return any(
+        hasattr(value, ENTRYPOINT_EXTENSIONS_ATTR)
+        for klass in cls.__mro__
+        for value in vars(klass).values()
+    )
 
 
 def import_service(module_name: str):
@@ -57,10 +55,8 @@ def import_service(module_name: str):
                 )
             )
 
-        missing_module_re = MISSING_MODULE_TEMPLATE.format(module_name)
-        # 有没有更好的方法来做到这一点？
-
-        if re.match(missing_module_re, str(exc)):
+        # 模块本身不存在（而不是模块内部的导入失败）
+        if isinstance(exc, ModuleNotFoundError) and exc.name == module_name:
             raise CommandError(exc)
 
         # 找到模块，但在其他地方导入时引发了导入错误，让它冒泡（导致打印完整的堆栈跟踪）。
@@ -73,8 +69,12 @@ def import_service(module_name: str):
     if obj is None:
         found_services = []
         # 查找具有入口点的顶级对象（service）。
-        for _, potential_service in inspect.getmembers(module, is_type):
-            if inspect.getmembers(potential_service, is_entrypoint):
+        members = vars(module)
+        for name in sorted(members):
+            potential_service = members[name]
+            if isinstance(potential_service, type) and has_entrypoints(
+                potential_service
+            ):
                 found_services.append(potential_service)
 
         if not found_services:
@@ -67,10 +67,31 @@ def make_nameko_helper(config):
     "reply"
 
     >>> n.dispatch_event('service', 'event_type', 'event_data')
+
+    >>> n.dispatch_event.many('service', 'event_type', ['data1', 'data2'])
 """
     proxy = ClusterRpcProxy(config)
     module.rpc = proxy.start()
-    module.dispatch_event = event_dispatcher(config)
+
+    dispatcher = None
+
+    def get_dispatcher():
+        # 事件分发器在首次分发时才创建，之后复用，从而不拖慢 shell 的启动
+        nonlocal dispatcher
+        if dispatcher is None:
+            dispatcher = event_dispatcher(config)
+        return dispatcher
+
+    def dispatch_event(service_name, event_type, event_data):
+        """分发一个声称来自 `service_name` 的事件。"""
+        get_dispatcher()(service_name, event_type, event_data)
+
+    def dispatch_many(service_name, event_type, events_data, batch=64):
+        """批量分发多个同类型的事件，参见 :func:`nameko.standalone.events.event_dispatcher` 。"""
+        get_dispatcher().many(service_name, event_type, events_data, batch=batch)
+
+    dispatch_event.many = dispatch_many
+    module.dispatch_event = dispatch_event
     module.config = config
     module.disconnect = proxy.stop
     return module
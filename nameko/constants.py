@@ -1,5 +1,6 @@
 AMQP_URI_CONFIG_KEY = 'AMQP_URI'
 WEB_SERVER_CONFIG_KEY = 'WEB_SERVER_ADDRESS'
+WEB_MAX_CONNECTIONS_CONFIG_KEY = 'WEB_MAX_CONNECTIONS'
 RPC_EXCHANGE_CONFIG_KEY = 'rpc_exchange'
 SERIALIZER_CONFIG_KEY = 'serializer'
 SERIALIZERS_CONFIG_KEY = 'SERIALIZERS'
@@ -7,9 +7,10 @@ if TYPE_CHECKING:
 
 import inspect
 import sys
-import uuid
 from collections import deque
-from logging import getLogger
+from logging import DEBUG, getLogger
+from os import urandom as _urandom
+from types import FunctionType
 from typing import (
     Type,
     Union,
@@ -28,7 +29,7 @@ import eventlet
 import six
 from eventlet.event import Event
 from eventlet.greenpool import GreenPool
-from greenlet import GreenletExit  # pylint: disable=E0611
+from greenlet import GreenletExit, greenlet  # pylint: disable=E0611
 
 from nameko import serialization
 from nameko.constants import (
@@ -58,7 +59,10 @@ _log_time = make_timing_logger(_log)
 if six.PY2:  # pragma: no cover
     is_method = inspect.ismethod
 else:  # pragma: no cover
-    is_method = inspect.isfunction
+
+    def is_method(obj: Any) -> bool:
+        # 等价于 `inspect.isfunction` ：`FunctionType` 不能被继承，可以直接比较类型
+        return type(obj) is FunctionType
 
 
 def get_service_name(service_cls: Type):
@@ -87,18 +91,71 @@ def get_container_cls(config: dict) -> Union[Type[ServiceContainer], Any]:
     return import_from_path(class_path) or ServiceContainer
 
 
+def _iter_class_attrs(cls: Type):
+    """按 MRO 顺序产出类（包括其基类）中定义的 ``(name, value)``
+
+    与 ``inspect.getmembers`` 不同，这里直接读取各个类的 ``__dict__`` ，
+    不会对每个属性调用 ``getattr`` （从而触发描述符），也不对结果排序。
+    被子类覆盖的同名属性只产出最派生的那一个。
+    """
+    seen = set()
+    for klass in cls.__mro__:
+        for name, value in vars(klass).items():
+            if name not in seen:
+                seen.add(name)
+                yield name, value
+
+
+def _discover_service_members(service_cls: Type):
+    """返回服务类中声明的依赖提供者以及入口点
+
+    结果为 ``(dependency_members, entrypoint_members)`` ，其中
+    ``entrypoint_members`` 只包含确实声明了入口点的方法。
+    """
+    dependency_members: List[Tuple[str, DependencyProvider]] = []
+    entrypoint_members: List[Tuple[str, List[Entrypoint]]] = []
+
+    # 一次遍历同时提取 DependencyProvider 子类的定义，以及声明了入口点的函数
+    for name, value in _iter_class_attrs(service_cls):
+        if is_dependency(value):
+            dependency_members.append((name, value))
+            continue
+        if isinstance(value, (staticmethod, classmethod)):
+            # `getattr` 会解开这两种包装，直接读取 `__dict__` 时需要手动取出原函数
+            value = value.__func__
+        if is_method(value):
+            entrypoints = getattr(value, ENTRYPOINT_EXTENSIONS_ATTR, None)
+            if entrypoints:
+                entrypoint_members.append((name, list(entrypoints)))
+
+    return dependency_members, entrypoint_members
+
+
+def get_call_id_stack_maxlen(config: dict) -> int:
+    """调用ID栈的最大长度：跟踪的父级调用数量加上当前调用本身"""
+    return config.get(PARENT_CALLS_CONFIG_KEY, DEFAULT_PARENT_CALLS_TRACKED) + 1
+
+
+# 将随机的 128 位整数设置为第 4 版、RFC 4122 变体的 UUID 所需的位掩码
+_UUID4_CLEAR_BITS = ~((0xF000 << 64) | (0xC000 << 48))
+_UUID4_SET_BITS = (0x4000 << 64) | (0x8000 << 48)
+
+
 def new_call_id():
-    return str(uuid.uuid4())
+    """生成一个与 ``str(uuid.uuid4())`` 格式相同的随机ID
+
+    每个工作者都会调用它；直接格式化随机字节，而不构造 ``uuid.UUID`` 对象。
+    """
+    value = int.from_bytes(_urandom(16), "big") & _UUID4_CLEAR_BITS | _UUID4_SET_BITS
+    hex_ = "%032x" % value
+    return "{}-{}-{}-{}-{}".format(
+        hex_[:8], hex_[8:12], hex_[12:16], hex_[16:20], hex_[20:]
+    )
 
 
 class WorkerContext(object):
     """工作者上下文"""
 
-    _call_id = None
-    _call_id_stack = None
-    # _parent_call_id_stack = None
-    _parent_call_id_stack = []
-
     def __init__(
         self,
         container: ServiceContainer,
@@ -119,18 +176,20 @@ class WorkerContext(object):
         self.kwargs: Mapping = kwargs if kwargs is not None else {}
         self.data: dict = data if data is not None else {}
 
+        self._call_id = None
+        self._call_id_stack = None
         self._parent_call_id_stack = self.data.pop(CALL_ID_STACK_CONTEXT_KEY, [])
 
     @property
     def call_id_stack(self):
         if self._call_id_stack is None:
-            parent_calls_tracked = self.container.config.get(
-                PARENT_CALLS_CONFIG_KEY, DEFAULT_PARENT_CALLS_TRACKED
-            )
-            stack_length = parent_calls_tracked + 1
+            # 真正的 ServiceContainer 在初始化时已经计算好栈长度；
+            # 其它只实现了最小接口的容器（例如 standalone 代理或测试替身）则从配置中读取
+            stack_length = getattr(self.container, "call_id_stack_maxlen", None)
+            if stack_length is None:
+                stack_length = get_call_id_stack_maxlen(self.container.config)
 
-            self._call_id_stack = deque(maxlen=stack_length)
-            self._call_id_stack.extend(self._parent_call_id_stack)
+            self._call_id_stack = deque(self._parent_call_id_stack, maxlen=stack_length)
             self._call_id_stack.append(self.call_id)
         return list(self._call_id_stack)
 
@@ -182,6 +241,7 @@ class ServiceContainer(object):
         self.max_workers: int = (
             config.get(MAX_WORKERS_CONFIG_KEY) or DEFAULT_MAX_WORKERS
         )
+        self.call_id_stack_maxlen: int = get_call_id_stack_maxlen(config)
 
         # 向 kombu 中注册序列化方式
         self.serializer, self.accept = serialization.setup(self.config)
@@ -190,25 +250,16 @@ class ServiceContainer(object):
         self.dependencies = SpawningSet()
         self.subextensions = SpawningSet()
 
-        # 提取 服务类 service 中 的 属于 DependencyProvider 子类 的定义
-        dependency_attrs: List[Tuple[str, DependencyProvider]] = inspect.getmembers(
-            service_cls, is_dependency
+        dependency_members, entrypoint_members = _discover_service_members(
+            service_cls
         )
 
-        for attr_name, dependency in dependency_attrs:
+        for attr_name, dependency in dependency_members:
             bound = dependency.bind(self.interface, attr_name)
             self.dependencies.add(bound)
             self.subextensions.update(iter_extensions(bound))
 
-        # 提取 服务类 service 中 的 属于 函数 的定义， 作为入口点
-        entrypoints_methods: List[Tuple[str, Entrypoint]] = inspect.getmembers(
-            service_cls, is_method
-        )
-        for method_name, method in entrypoints_methods:
-            entrypoints: List[Entrypoint] = getattr(
-                method, ENTRYPOINT_EXTENSIONS_ATTR, []
-            )
-
+        for method_name, entrypoints in entrypoint_members:
             for entrypoint in entrypoints:
                 bound = entrypoint.bind(self.interface, method_name)
                 self.entrypoints.add(bound)
@@ -219,14 +270,23 @@ class ServiceContainer(object):
 
         self._worker_threads: Dict[WorkerContext, eventlet.greenthread.GreenThread] = {}
         self._managed_threads: Dict[
-            eventlet.greenthread.GreenThread, Optional[str]
+            Union[eventlet.greenthread.GreenThread, greenlet], Optional[str]
         ] = {}
         self._being_killed: bool = False
         self._died = Event()
 
     @property
     def extensions(self):
-        return SpawningSet(self.entrypoints | self.dependencies | self.subextensions)
+        """容器中所有绑定的扩展
+
+        每次访问时重新合并 ``entrypoints`` 、 ``dependencies`` 与 ``subextensions`` ，
+        因为这些集合在容器创建后仍可能被修改（例如
+        :func:`~nameko.testing.services.replace_dependencies` ）。
+        """
+        # 直接填充一个新的集合，避免 `|` 产生的中间集合
+        extensions = SpawningSet(self.entrypoints)
+        extensions.update(self.dependencies, self.subextensions)
+        return extensions
 
     @property
     def interface(self):
@@ -238,9 +298,14 @@ class ServiceContainer(object):
         _log.debug("starting %s", self)
         self.started = True
 
+        # `extensions` 每次访问都会合并三个集合；setup 与 start 之间成员不会变化，只合并一次。
+        # start 必须在所有扩展的 setup 都返回后才能调用，两个阶段之间保留屏障，
+        # 但复用同一个代理及其协程池
+        extensions = self.extensions.all
+
         with _log_time("started %s", self):
-            self.extensions.all.setup()  # 实际是调用的 Extention 子类 中 的 setup 函数，
-            self.extensions.all.start()  # 实际是调用的 Extention 子类 中 的 start 函数，
+            extensions.setup()  # 实际是调用的 Extention 子类 中 的 setup 函数，
+            extensions.start()  # 实际是调用的 Extention 子类 中 的 start 函数，
 
     def stop(self):
         """优雅地停止容器。
@@ -375,9 +440,10 @@ class ServiceContainer(object):
             _log.info("由于正在被终止，阻止工作线程的生成")
             raise ContainerBeingKilled()
 
-        service = self.service_cls()
+        # 服务实例在工作线程真正开始运行时才创建（见 `_run_worker`），
+        # 以免在工作线程池已满、等待空闲槽位时提前分配
         worker_ctx = WorkerContext(
-            self, service, entrypoint, args, kwargs, data=context_data
+            self, None, entrypoint, args, kwargs, data=context_data
         )
 
         _log.debug("生成 %s", worker_ctx)
@@ -406,6 +472,38 @@ class ServiceContainer(object):
         gt.link(self._handle_managed_thread_exited, identifier)
         return gt
 
+    def spawn_managed_thread_n(self, fn: Callable, identifier: Optional[str] = None):
+        """与 :meth:`spawn_managed_thread` 相同，但不返回线程句柄。
+
+        使用 :func:`eventlet.spawn_n` 生成线程，省去 `GreenThread` 对象及其
+        事件与回调的开销，适用于调用者不需要等待或终止该线程的场景，
+        例如为每个请求生成的处理线程。
+
+        线程仍由容器跟踪：未捕获的错误同样会导致容器被终止，
+        并且在 :meth:`ServiceContainer.stop` 或 :meth:`ServiceContainer.kill` 时
+        仍在运行的线程会被终止。
+        """
+        if identifier is None:
+            identifier = getattr(fn, "__name__", "<unknown>")
+
+        def run():
+            exc_info = None
+            try:
+                fn()
+            except GreenletExit:
+                _log.debug("%s 线程被容器终止", self)
+            except Exception:
+                exc_info = sys.exc_info()
+            finally:
+                self._managed_threads.pop(thread, None)
+
+            if exc_info is not None:
+                _log.critical("%s 线程以错误退出", self, exc_info=exc_info)
+                self.kill(exc_info)
+
+        thread = eventlet.spawn_n(run)
+        self._managed_threads[thread] = identifier
+
     def _run_worker(
         self,
         worker_ctx: WorkerContext,
@@ -413,9 +511,23 @@ class ServiceContainer(object):
     ):
         _log.debug("正在设置 %s", worker_ctx)
 
-        _log.debug(
-            "对于 %s 的调用栈: %s", worker_ctx, "->".join(worker_ctx.call_id_stack)
-        )
+        try:
+            worker_ctx.service = self.service_cls()
+        except Exception as exc:
+            # 与服务方法中的错误一样交给入口点处理，而不是让它逃出工作线程并终止容器；
+            # 依赖项尚未为此工作线程做任何设置，因此不调用它们的钩子
+            _log.exception("创建工作线程 %s 的服务实例时发生错误: %s", worker_ctx, exc)
+            if handle_result is not None:
+                exc_info = sys.exc_info()
+                handle_result(worker_ctx, None, exc_info)
+                del exc_info
+            return
+
+        # 调用栈参数会被立即求值（生成调用ID、构建栈并拼接字符串），仅在需要输出时才计算
+        if _log.isEnabledFor(DEBUG):
+            _log.debug(
+                "对于 %s 的调用栈: %s", worker_ctx, "->".join(worker_ctx.call_id_stack)
+            )
 
         with _log_time("运行工作线程 %s", worker_ctx):
             self._inject_dependencies(worker_ctx)
@@ -490,7 +602,8 @@ class ServiceContainer(object):
 
         if num_workers:
             _log.warning("正在终止 %s 个活跃工作线程", num_workers)
-            for worker_ctx, gt in list(self._worker_threads.items()):
+            # 终止线程时会修改字典，因此遍历其快照
+            for worker_ctx, gt in tuple(self._worker_threads.items()):
                 _log.warning("正在终止 %s 的活跃工作线程", worker_ctx)
                 gt.kill()
 
@@ -503,9 +616,12 @@ class ServiceContainer(object):
 
         if num_threads:
             _log.warning("正在终止 %s 个托管线程", num_threads)
-            for gt, identifier in list(self._managed_threads.items()):
+            for gt, identifier in tuple(self._managed_threads.items()):
                 _log.warning("正在终止托管线程 `%s`", identifier)
-                gt.kill()
+                # 同时适用于 `GreenThread` 以及 `spawn_managed_thread_n` 生成的 greenlet
+                eventlet.kill(gt)
+                # 尚未开始运行就被终止的 greenlet 不会执行自身的清理
+                self._managed_threads.pop(gt, None)
 
     def _handle_worker_thread_exited(
         self, gt: eventlet.greenthread.GreenThread, worker_ctx: WorkerContext
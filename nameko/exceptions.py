@@ -1,7 +1,7 @@
 from __future__ import unicode_literals
 
-import inspect
 import sys
+import weakref
 
 import six
 
@@ -35,6 +35,9 @@ class ContainerBeingKilled(Exception):
 
 registry = {}
 
+# 异常类型 -> 点分模块路径；使用弱引用键，以免阻止动态创建的异常类被回收
+_module_path_cache = weakref.WeakKeyDictionary()
+
 
 def get_module_path(exc_type):
     """返回 `exc_type` 的点分模块路径，包括类名。
@@ -45,8 +48,15 @@ def get_module_path(exc_type):
         >>> "nameko.exceptions.MethodNotFound"
 
     """
-    module = inspect.getmodule(exc_type)
-    return "{}.{}".format(module.__name__, exc_type.__name__)
+    try:
+        return _module_path_cache[exc_type]
+    except KeyError:
+        pass
+
+    # 类的 `__module__` 就是 `inspect.getmodule` 最终查找的模块名
+    path = "{}.{}".format(exc_type.__module__, exc_type.__name__)
+    _module_path_cache[exc_type] = path
+    return path
 
 
 class RemoteError(Exception):
@@ -59,34 +69,92 @@ class RemoteError(Exception):
         super(RemoteError, self).__init__(message)
 
 
-def safe_for_serialization(value):
-    """在准备将值序列化为 JSON 时进行转换。
+# 无需 isinstance 检查即可直接字符串化的常见标量类型
+_STRINGIFIED_TYPES = frozenset((int, float, bool, type(None)))
 
-    对于字符串，映射和可迭代对象不进行操作，其条目被处理为安全；对于所有其他值，进行字符串化，如果失败则使用回退值。
-    """
 
+def _convert_for_serialization(value):
+    """转换单个值，返回 ``(converted, entries)`` 。
+
+    对于映射和可迭代对象， ``converted`` 是一个空的 dict 或 list ，
+    ``entries`` 是尚待处理的条目的迭代器；对于其它值， ``entries`` 为 ``None`` 。
+    """
+    # 先按精确类型分派最常见的情况，避免 `Iterable` 这类 ABC 的 isinstance 检查
+    value_type = type(value)
+    if value_type is str:
+        return value, None
+    if value_type is dict:
+        return {}, iter(value.items())
+    if value_type is list or value_type is tuple:
+        return [], iter(value)
+    if value_type in _STRINGIFIED_TYPES:
+        return six.text_type(value), None
+
+    # 子类以及其它类型
     if isinstance(value, six.string_types):
-        return value
+        return value, None
     if isinstance(value, dict):
-        return {
-            safe_for_serialization(key): safe_for_serialization(val)
-            for key, val in six.iteritems(value)
-        }
+        return {}, iter(six.iteritems(value))
     if isinstance(value, Iterable):
-        return list(map(safe_for_serialization, value))
+        return [], iter(value)
 
     try:
-        return six.text_type(value)
+        return six.text_type(value), None
     except Exception:
-        return "[__unicode__ failed]"
+        return "[__unicode__ failed]", None
+
+
+def safe_for_serialization(value):
+    """在准备将值序列化为 JSON 时进行转换。
+
+    对于字符串，映射和可迭代对象不进行操作，其条目被处理为安全；对于所有其他值，进行字符串化，如果失败则使用回退值。
+
+    使用显式的栈而不是递归来遍历嵌套结构。
+    """
+    result, entries = _convert_for_serialization(value)
+    if entries is None:
+        return result
+
+    # 栈中每一项为 (原始对象的 id, 输出容器, 尚待处理的条目)
+    stack = [(id(value), result, entries)]
+    active = {id(value)}
+
+    while stack:
+        _, target, entries = stack[-1]
+        is_mapping = type(target) is dict
+
+        for entry in entries:
+            if is_mapping:
+                key, item = entry
+                converted, children = _convert_for_serialization(item)
+                # 键一般是标量，直接递归转换即可
+                target[safe_for_serialization(key)] = converted
+            else:
+                item = entry
+                converted, children = _convert_for_serialization(item)
+                target.append(converted)
+
+            if children is not None:
+                if id(item) in active:
+                    raise ValueError("无法序列化包含循环引用的值")
+                # 先处理子容器，处理完后再继续当前容器剩余的条目
+                stack.append((id(item), converted, children))
+                active.add(id(item))
+                break
+        else:
+            active.discard(stack.pop()[0])
+
+    return result
 
 
 def serialize(exc):
     """将 `self.exc` 序列化为表示它的数据字典。"""
+    exc_type = type(exc)
 
     return {
-        "exc_type": type(exc).__name__,
-        "exc_path": get_module_path(type(exc)),
+        "exc_type": exc_type.__name__,
+        # 已注册的异常类型在 `deserialize_to_instance` 时就已缓存了路径
+        "exc_path": get_module_path(exc_type),
         "exc_args": list(map(safe_for_serialization, exc.args)),
         "value": safe_for_serialization(exc),
     }
@@ -6,6 +6,7 @@ import warnings
 import weakref
 from functools import partial
 from logging import getLogger
+from operator import itemgetter
 from typing import Any, Type
 
 from eventlet.event import Event
@@ -86,7 +87,7 @@ class Extension(object):
         instance = clone(self)
 
         # recurse over sub-extensions
-        for name, ext in inspect.getmembers(self, is_extension):
+        for name, ext in get_sub_extensions(self):
             setattr(instance, name, ext.bind(container))
         return instance
 
@@ -194,13 +195,15 @@ class ProviderCollector(object):
 
     def unregister_provider(self, provider):
         providers = self._providers
-        if provider not in self._providers:
+        # 一次哈希查找同时完成成员检查与移除
+        try:
+            providers.remove(provider)
+        except KeyError:
             return
 
         _log.debug("unregistering provider %s for %s", provider, self)
 
-        providers.remove(provider)
-        if len(providers) == 0:
+        if not providers:
             _log.debug("last provider unregistered for %s", self)
             self._last_provider_unregistered.send()
 
@@ -219,6 +222,12 @@ class ProviderCollector(object):
         self.wait_for_providers()
 
 
+def _register_decorated(cls, args, kwargs, fn):
+    """实例化 `cls(*args, **kwargs)` 并将其注册为 `fn` 的入口点。"""
+    register_entrypoint(fn, cls(*args, **kwargs))
+    return fn
+
+
 def register_entrypoint(fn, entrypoint):
     descriptors = getattr(fn, ENTRYPOINT_EXTENSIONS_ATTR, None)
 
@@ -235,6 +244,11 @@ class Entrypoint(Extension):
     method_name = None
     """ 记录了RPC调用的方法名称 """
 
+    _signature = None
+
+    # 由 :func:`nameko.utils.get_redacted_args` 缓存的方法签名及 ``sensitive_arguments`` 解析结果
+    _sensitive_paths = None
+
     def __init__(self, expected_exceptions=(), sensitive_arguments=(), **kwargs):
         """
         :Parameters:
@@ -271,31 +285,44 @@ class Entrypoint(Extension):
     def check_signature(self, args, kwargs):
         service_cls = self.container.service_cls
         fn = getattr(service_cls, self.method_name)
+
+        # 每个请求都会检查签名；签名只需解析一次，但如果方法被替换（例如在测试中被 patch），
+        # 则重新解析
+        cached = self._signature
+        if cached is not None and cached[0] is fn:
+            signature = cached[1]
+        else:
+            # 与 `inspect.getcallargs` 一致，不跟随 `__wrapped__` 解析被装饰的原函数
+            signature = inspect.signature(fn, follow_wrapped=False)
+            self._signature = (fn, signature)
+
+        service_instance = None  # fn is unbound
         try:
-            service_instance = None  # fn is unbound
-            inspect.getcallargs(fn, service_instance, *args, **kwargs)
+            signature.bind(service_instance, *args, **kwargs)
         except TypeError as exc:
-            raise IncorrectSignature(str(exc))
+            # 错误信息会通过 `RemoteError` 传给调用方，因此用 `inspect.getcallargs`
+            # 重新生成，保持原有的措辞（例如 "method() missing 1 required positional argument"）
+            message = str(exc)
+            try:
+                inspect.getcallargs(fn, service_instance, *args, **kwargs)
+            except TypeError as callargs_exc:
+                message = str(callargs_exc)
+            raise IncorrectSignature(message)
 
     @classmethod
     def decorator(cls, *args, **kwargs):
-        def registering_decorator(fn, args, kwargs):
-            instance = cls(*args, **kwargs)
-            register_entrypoint(fn, instance)
-            return fn
-
         if len(args) == 1 and isinstance(args[0], types.FunctionType):
             # usage without arguments to the decorator:
             # @foobar
             # def spam():
             #     pass
-            return registering_decorator(args[0], args=(), kwargs={})
+            return _register_decorated(cls, (), {}, args[0])
         else:
             # usage with arguments to the decorator:
             # @foobar('shrub', ...)
             # def spam():
             #     pass
-            return partial(registering_decorator, args=args, kwargs=kwargs)
+            return partial(_register_decorated, cls, args, kwargs)
 
     def __repr__(self):
         if not self.is_bound():
@@ -319,9 +346,79 @@ def is_entrypoint(obj: Any):
     return isinstance(obj, Entrypoint)
 
 
+# 扩展类 -> (类中声明的子扩展属性名, 需要在实例上求值的描述符属性名)
+_extension_attrs_cache: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def _get_extension_attrs(cls):
+    try:
+        return _extension_attrs_cache[cls]
+    except KeyError:
+        pass
+
+    extension_names = []
+    descriptor_names = []
+    seen = set()
+    for klass in cls.__mro__:
+        for name, value in vars(klass).items():
+            if name in seen:
+                continue
+            seen.add(name)
+            if is_extension(value):
+                extension_names.append(name)
+            elif name.startswith("__") and name.endswith("__"):
+                continue
+            elif isinstance(value, (types.FunctionType, staticmethod, classmethod)):
+                # 在实例上访问时只会得到（绑定）方法，不可能是扩展
+                continue
+            elif hasattr(type(value), "__get__"):
+                descriptor_names.append(name)
+
+    attrs = (tuple(extension_names), tuple(descriptor_names))
+    _extension_attrs_cache[cls] = attrs
+    return attrs
+
+
+def get_sub_extensions(extension):
+    """返回 `extension` 直接声明的子扩展，即按名称排序的 ``(name, ext)`` 列表。
+
+    结果与 ``inspect.getmembers(extension, is_extension)`` 相同，但只检查实例属性、
+    类中声明的扩展以及描述符（例如 property），而不是对 ``dir(extension)``
+    中的每个名称调用 ``getattr`` 。描述符仍然会在实例上被求值。
+    """
+    extension_names, descriptor_names = _get_extension_attrs(type(extension))
+    instance_attrs = getattr(extension, "__dict__", {})
+
+    members = {
+        name: value for name, value in instance_attrs.items() if is_extension(value)
+    }
+    for name in extension_names:
+        if name not in instance_attrs:
+            members[name] = getattr(extension, name)
+    for name in descriptor_names:
+        try:
+            value = getattr(extension, name)
+        except AttributeError:
+            continue
+        if is_extension(value):
+            members[name] = value
+        else:
+            members.pop(name, None)
+
+    return sorted(members.items(), key=itemgetter(0))
+
+
 def iter_extensions(extension):
     """对 `extension` 的子扩展进行深度优先迭代器。"""
-    for _, ext in inspect.getmembers(extension, is_extension):
-        for item in iter_extensions(ext):
-            yield item
-        yield ext
+    # 以显式栈代替递归生成器：每个子扩展在其全部子扩展之后产出（后序），
+    # 与递归实现的顺序一致，但不必逐层转发 `yield`
+    stack = [(extension, iter(get_sub_extensions(extension)))]
+    while stack:
+        parent, children = stack[-1]
+        for _, ext in children:
+            stack.append((ext, iter(get_sub_extensions(ext))))
+            break
+        else:
+            stack.pop()
+            if stack:
+                yield parent
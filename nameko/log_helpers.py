@@ -2,7 +2,7 @@ from __future__ import absolute_import
 
 import logging
 import time
-from contextlib import contextmanager
+from contextlib import contextmanager, nullcontext
 
 
 def make_timing_logger(logger, precision=3, level=logging.DEBUG):
@@ -19,17 +19,26 @@ def make_timing_logger(logger, precision=3, level=logging.DEBUG):
         INFO:foobar:hello world in 1.00s
     """
 
+    # 计时信息的格式只与 `precision` 有关，只需格式化一次
+    suffix = " in %0.{}fs".format(precision)
+
     @contextmanager
-    def log_time(msg, *args):
-        """在上下文块退出时，记录 `msg` 和 `*args` 以及（简单的挂钟）计时信息。"""
+    def timed(msg, args):
         start_time = time.time()
 
         try:
             yield
         finally:
-            message = "{} in %0.{}fs".format(msg, precision)
             duration = time.time() - start_time
-            args = args + (duration,)
-            logger.log(level, message, *args)
+            logger.log(level, msg + suffix, *(args + (duration,)))
+
+    def log_time(msg, *args):
+        """在上下文块退出时，记录 `msg` 和 `*args` 以及（简单的挂钟）计时信息。
+
+        如果记录器未启用 `level` 级别，则不计时也不格式化消息。
+        """
+        if not logger.isEnabledFor(level):
+            return nullcontext()
+        return timed(msg, args)
 
     return log_time
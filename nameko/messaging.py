@@ -8,7 +8,6 @@ import warnings
 from functools import partial
 from logging import getLogger
 
-import six
 from amqp.exceptions import ConnectionError
 from eventlet.event import Event
 from kombu import Connection
@@ -43,39 +42,38 @@ _log = getLogger(__name__)
 class HeaderEncoder(object):
     header_prefix = HEADER_PREFIX
 
-    def _get_header_name(self, key):
-        return "{}.{}".format(self.header_prefix, key)
-
     def get_message_headers(self, worker_ctx):
         data = worker_ctx.context_data
 
-        if None in data.values():
+        # 前缀每条消息只格式化一次（`header_prefix` 可能在实例上被覆盖，故不缓存），
+        # 并在同一次遍历中丢弃 `None` 值
+        prefix = self.header_prefix + "."
+        headers = {}
+        dropped = False
+        for key, value in data.items():
+            if value is None:
+                dropped = True
+                continue
+            headers[prefix + key] = value
+
+        if dropped:
             warnings.warn(
                 "尝试发布无法序列化的头部值。 "
                 "值为 `None` 的头部将从有效负载中丢弃。",
                 UserWarning,
             )
-
-        headers = {
-            self._get_header_name(key): value
-            for key, value in data.items()
-            if value is not None
-        }
         return headers
 
 
 class HeaderDecoder(object):
     header_prefix = HEADER_PREFIX
 
-    def _strip_header_name(self, key):
-        full_prefix = "{}.".format(self.header_prefix)
-        if key.startswith(full_prefix):
-            return key[len(full_prefix) :]
-        return key
-
     def unpack_message_headers(self, message):
+        prefix = self.header_prefix + "."
+        prefix_len = len(prefix)
         stripped = {
-            self._strip_header_name(k): v for k, v in six.iteritems(message.headers)
+            (key[prefix_len:] if key.startswith(prefix) else key): value
+            for key, value in message.headers.items()
         }
         return stripped
 
@@ -157,9 +155,15 @@ class Publisher(DependencyProvider, HeaderEncoder):
     def setup(self):
         ssl = self.container.config.get(AMQP_SSL_CONFIG_KEY)
         login_method = self.container.config.get(LOGIN_METHOD_CONFIG_KEY)
-        with get_connection(self.amqp_uri, ssl) as conn:
-            for entity in self.declare:
-                maybe_declare(entity, conn.channel())
+        if self.declare:
+            with get_connection(self.amqp_uri, ssl) as conn:
+                # 所有实体都在同一个信道上声明，而不是每个实体各开一个信道
+                channel = conn.channel()
+                try:
+                    for entity in self.declare:
+                        maybe_declare(entity, channel)
+                finally:
+                    channel.close()
 
         serializer = self.options.pop("serializer", self.serializer)
 
@@ -186,6 +190,9 @@ class QueueConsumer(SharedExtension, ProviderCollector, ConsumerMixin):
     def __init__(self):
         self._consumers = {}
         self._pending_remove_providers = {}
+        # 每个提供者预先格式化的托管线程标识前缀，避免每条消息都格式化
+        self._ident_prefixes = {}
+        self._connection_params = None
 
         self._gt = None
         self._starting = False
@@ -263,6 +270,7 @@ class QueueConsumer(SharedExtension, ProviderCollector, ConsumerMixin):
         if self._gt is not None and not self._gt.dead:
             self._providers = set()
             self._pending_remove_providers = {}
+            self._ident_prefixes = {}
             self.should_stop = True
             try:
                 self._gt.wait()
@@ -290,7 +298,8 @@ class QueueConsumer(SharedExtension, ProviderCollector, ConsumerMixin):
     def ack_message(self, message):
         # 只有在消息连接仍然活跃时才尝试确认消息；
         # 否则，消息将已经被代理回收
-        if message.channel.connection:
+        channel = message.channel
+        if channel is not None and channel.connection:
             try:
                 message.ack()
             except ConnectionError:  # pragma: no cover
@@ -299,7 +308,8 @@ class QueueConsumer(SharedExtension, ProviderCollector, ConsumerMixin):
     def requeue_message(self, message):
         # 只有在消息连接仍然活跃时才尝试重新排队消息；
         # 否则，消息将已经被代理回收
-        if message.channel.connection:
+        channel = message.channel
+        if channel is not None and channel.connection:
             try:
                 message.requeue()
             except ConnectionError:  # pragma: no cover
@@ -311,6 +321,7 @@ class QueueConsumer(SharedExtension, ProviderCollector, ConsumerMixin):
 
         for provider, removed_event in provider_remove_events:
             consumer = self._consumers.pop(provider)
+            self._ident_prefixes.pop(provider, None)
 
             _log.debug("正在取消消费者 [%s]: %s", provider, consumer)
             consumer.cancel()
@@ -323,26 +334,33 @@ class QueueConsumer(SharedExtension, ProviderCollector, ConsumerMixin):
         `Connection` 对象是连接参数的声明，采用懒加载方式进行评估。
         此时，它并不表示与代理的已建立连接。
         """
-        heartbeat = self.container.config.get(HEARTBEAT_CONFIG_KEY, DEFAULT_HEARTBEAT)
-        transport_options = self.container.config.get(
-            TRANSPORT_OPTIONS_CONFIG_KEY, DEFAULT_TRANSPORT_OPTIONS
-        )
-        ssl = self.container.config.get(AMQP_SSL_CONFIG_KEY)
-        login_method = self.container.config.get(LOGIN_METHOD_CONFIG_KEY)
-        conn = Connection(
-            self.amqp_uri,
-            transport_options=transport_options,
-            heartbeat=heartbeat,
-            ssl=ssl,
-            login_method=login_method,
-        )
+        params = self._connection_params
+        if params is None:
+            # 容器的配置在其生命周期内不变，连接参数在首次使用时读取一次，
+            # 之后的每次（重新）连接都直接复用
+            config = self.container.config
+            params = self._connection_params = dict(
+                transport_options=config.get(
+                    TRANSPORT_OPTIONS_CONFIG_KEY, DEFAULT_TRANSPORT_OPTIONS
+                ),
+                heartbeat=config.get(HEARTBEAT_CONFIG_KEY, DEFAULT_HEARTBEAT),
+                ssl=config.get(AMQP_SSL_CONFIG_KEY),
+                login_method=config.get(LOGIN_METHOD_CONFIG_KEY),
+            )
+        conn = Connection(self.amqp_uri, **params)
 
         return conn
 
+    def _get_ident_prefix(self, provider):
+        prefix = self._ident_prefixes.get(provider)
+        if prefix is None:
+            prefix = "{}.handle_message[".format(type(provider).__name__)
+            self._ident_prefixes[provider] = prefix
+        return prefix
+
     def handle_message(self, provider, body, message):
-        ident = "{}.handle_message[{}]".format(
-            type(provider).__name__, message.delivery_info["routing_key"]
-        )
+        routing_key = message.delivery_info["routing_key"]
+        ident = self._get_ident_prefix(provider) + routing_key + "]"
         self.container.spawn_managed_thread(
             partial(provider.handle_message, body, message), identifier=ident
         )
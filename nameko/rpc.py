@@ -3,7 +3,7 @@ from __future__ import absolute_import, unicode_literals
 import sys
 import uuid
 import warnings
-from functools import partial
+from functools import lru_cache, partial
 from logging import getLogger
 from typing import Optional
 
@@ -45,11 +45,19 @@ RPC_QUEUE_TEMPLATE = "rpc-{}"
 RPC_REPLY_QUEUE_TEMPLATE = "rpc.reply-{}-{}"
 RPC_REPLY_QUEUE_TTL = 300000  # ms (5 mins)
 
+# kombu 注册与注销序列化器时原地修改该字典，预先绑定可省去每次响应的属性链查找
+_content_type_to_serializer = kombu.serialization.registry.type_to_name
+
+
+@lru_cache(maxsize=16)
+def _get_rpc_exchange(exchange_name):
+    return Exchange(exchange_name, durable=True, type="topic")
+
 
 def get_rpc_exchange(config):
+    # 每次 RPC 调用和响应都会获取交换机；同名交换机共享同一个 `Exchange` 实例
     exchange_name = config.get(RPC_EXCHANGE_CONFIG_KEY, "nameko-rpc")
-    exchange = Exchange(exchange_name, durable=True, type="topic")
-    return exchange
+    return _get_rpc_exchange(exchange_name)
 
 
 class RpcConsumer(SharedExtension, ProviderCollector):
@@ -58,6 +66,9 @@ class RpcConsumer(SharedExtension, ProviderCollector):
     def __init__(self):
         self._unregistering_providers = set()
         self._unregistered_from_queue_consumer = Event()
+        # 路由键 -> 提供者，每条入站 RPC 消息都以此查找，而不是逐个扫描提供者
+        self._providers_by_routing_key = {}
+        self._responder_options = None
         self.queue = None
         super(RpcConsumer, self).__init__()
 
@@ -85,6 +96,13 @@ class RpcConsumer(SharedExtension, ProviderCollector):
             self.queue_consumer.unregister_provider(self)
             self._unregistered_from_queue_consumer.send(True)
 
+    def _get_routing_key(self, provider):
+        return "{}.{}".format(self.container.service_name, provider.method_name)
+
+    def register_provider(self, provider):
+        super(RpcConsumer, self).register_provider(provider)
+        self._providers_by_routing_key[self._get_routing_key(provider)] = provider
+
     def unregister_provider(self, provider):
         """注销提供者。
 
@@ -102,16 +120,16 @@ class RpcConsumer(SharedExtension, ProviderCollector):
         self._unregistered_from_queue_consumer.wait()
         super(RpcConsumer, self).unregister_provider(provider)
 
-    def get_provider_for_method(self, routing_key):
-        service_name = self.container.service_name
+        routing_key = self._get_routing_key(provider)
+        if self._providers_by_routing_key.get(routing_key) is provider:
+            del self._providers_by_routing_key[routing_key]
 
-        for provider in self._providers:
-            key = "{}.{}".format(service_name, provider.method_name)
-            if key == routing_key:
-                return provider
-        else:
+    def get_provider_for_method(self, routing_key):
+        provider = self._providers_by_routing_key.get(routing_key)
+        if provider is None:
             method_name = routing_key.split(".")[-1]
             raise MethodNotFound(method_name)
+        return provider
 
     def handle_message(self, body, message):
         routing_key = message.delivery_info["routing_key"]
@@ -122,14 +140,24 @@ class RpcConsumer(SharedExtension, ProviderCollector):
             exc_info = sys.exc_info()
             self.handle_result(message, None, exc_info)
 
+    def _get_responder_options(self):
+        options = self._responder_options
+        if options is None:
+            # 容器配置在其生命周期内不变，只在首次响应时读取一次
+            config = self.container.config
+            options = self._responder_options = (
+                config[AMQP_URI_CONFIG_KEY],
+                get_rpc_exchange(config),
+                config.get(SERIALIZER_CONFIG_KEY, DEFAULT_SERIALIZER),
+                config.get(AMQP_SSL_CONFIG_KEY),
+                config.get(LOGIN_METHOD_CONFIG_KEY),
+            )
+        return options
+
     def handle_result(self, message, result, exc_info):
-        amqp_uri = self.container.config[AMQP_URI_CONFIG_KEY]
-        serializer = self.container.config.get(
-            SERIALIZER_CONFIG_KEY, DEFAULT_SERIALIZER
+        amqp_uri, exchange, serializer, ssl, login_method = (
+            self._get_responder_options()
         )
-        exchange = get_rpc_exchange(self.container.config)
-        ssl = self.container.config.get(AMQP_SSL_CONFIG_KEY)
-        login_method = self.container.config.get(LOGIN_METHOD_CONFIG_KEY)
 
         responder = Responder(
             amqp_uri, exchange, serializer, message, ssl=ssl, login_method=login_method
@@ -184,6 +212,9 @@ rpc = Rpc.decorator
 
 
 class Responder(object):
+    # 每个 RPC 响应都会创建一个实例：不需要实例字典
+    __slots__ = ("amqp_uri", "serializer", "message", "exchange", "ssl", "login_method")
+
     publisher_cls = Publisher
 
     def __init__(
@@ -203,18 +234,20 @@ class Responder(object):
 
         # 发送以与请求消息相同的方式编码的响应。
         content_type = self.message.properties["content_type"]
-        serializer = kombu.serialization.registry.type_to_name[content_type]
+        serializer = _content_type_to_serializer[content_type]
 
         # 灾难避免序列化检查：`result` 必须是可序列化的，
         # 否则容器将假定发生不可恢复的错误而自杀（消息将被重新排队给另一个处理者）。
+        # `None`（无返回值的方法以及出错时）无需预先编码检查。
 
-        try:
-            kombu.serialization.dumps(result, serializer)
-        except Exception:
-            exc_info = sys.exc_info()
-            # 下面的 `error` 确保能够序列化为 JSON。
-            error = serialize(UnserializableValueError(result))
-            result = None
+        if result is not None:
+            try:
+                kombu.serialization.dumps(result, serializer)
+            except Exception:
+                exc_info = sys.exc_info()
+                # 下面的 `error` 确保能够序列化为 JSON。
+                error = serialize(UnserializableValueError(result))
+                result = None
 
         payload = {"result": result, "error": error}
 
@@ -296,6 +329,8 @@ class RpcProxy(DependencyProvider):
 
 
 class ServiceProxy(object):
+    # 不使用 `__slots__`：服务测试常直接给代理赋值或用 `patch.object` 替换其方法
+
     def __init__(
         self, worker_ctx, service_name, reply_listener: ReplyListener, **options
     ):
@@ -303,24 +338,36 @@ class ServiceProxy(object):
         self.service_name = service_name
         self.reply_listener = reply_listener
         self.options = options
+        self._method_proxies = {}
 
     def __getattr__(self, name):
-        return MethodProxy(
-            self.worker_ctx,
-            self.service_name,
-            name,
-            self.reply_listener,
-            **self.options,
-        )
+        if name == "_method_proxies":
+            # 尚未初始化（例如复制或反序列化时），避免无限递归
+            raise AttributeError(name)
+
+        # 同一个工作者对同一方法的多次调用复用同一个方法代理（及其发布者）
+        method_proxy = self._method_proxies.get(name)
+        if method_proxy is None:
+            method_proxy = MethodProxy(
+                self.worker_ctx,
+                self.service_name,
+                name,
+                self.reply_listener,
+                **self.options,
+            )
+            self._method_proxies[name] = method_proxy
+        return method_proxy
 
 
 class RpcReply(object):
     """解析RPC响应内容"""
 
-    resp_body: Optional[dict] = None
+    # 每次 RPC 调用都会创建一个实例
+    __slots__ = ("reply_event", "resp_body")
 
     def __init__(self, reply_event: Event):
         self.reply_event = reply_event
+        self.resp_body: Optional[dict] = None
 
     def result(self):
         _log.debug("等待 RPC 响应事件 %s", self)
@@ -1,5 +1,3 @@
-from copy import deepcopy
-
 import kombu.serialization
 
 from nameko.constants import (
@@ -13,8 +11,10 @@ from nameko.utils import import_from_path
 def setup(config: dict):
     """ 启用序列化, 并向kombu.serialization 注册 """
 
-    serializers = deepcopy(config.get(SERIALIZERS_CONFIG_KEY, {}))
+    # 每个容器都会调用；只需浅拷贝每个序列化器的参数，以免 `pop` 修改配置
+    serializers = config.get(SERIALIZERS_CONFIG_KEY, {})
     for name, kwargs in serializers.items():
+        kwargs = dict(kwargs)
         encoder = import_from_path(kwargs.pop('encoder'))
         decoder = import_from_path(kwargs.pop('decoder'))
         kombu.serialization.register(
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from kombu import Exchange
 
 from nameko import serialization
@@ -8,27 +10,44 @@ from nameko.constants import (
 )
 
 
-def get_event_exchange(service_name, config):
-    """ 获取 ``service_name`` 事件的交换机。
-    """
-    auto_delete = config.get("AUTO_DELETE_EVENT_EXCHANGES")
-    disable_exchange_declaration = config.get("DECLARE_EVENT_EXCHANGES") is False
-
+@lru_cache(maxsize=128, typed=True)
+def _get_event_exchange(service_name, auto_delete, no_declare):
     exchange_name = "{}.events".format(service_name)
-    exchange = Exchange(
+    return Exchange(
         exchange_name,
         type='topic',
         durable=True,
         delivery_mode=PERSISTENT,
         auto_delete=auto_delete,
-        no_declare=disable_exchange_declaration,
+        no_declare=no_declare,
     )
 
-    return exchange
+
+def get_event_exchange(service_name, config):
+    """ 获取 ``service_name`` 事件的交换机。
+
+    相同服务名与配置的调用共享同一个 ``Exchange`` 实例（其声明是幂等的），
+    避免每次分发事件或每个事件处理程序都重新构造。
+    """
+    auto_delete = config.get("AUTO_DELETE_EVENT_EXCHANGES")
+    disable_exchange_declaration = config.get("DECLARE_EVENT_EXCHANGES") is False
+
+    try:
+        return _get_event_exchange(
+            service_name, auto_delete, disable_exchange_declaration
+        )
+    except TypeError:
+        # 不可哈希的配置值，无法缓存
+        return _get_event_exchange.__wrapped__(
+            service_name, auto_delete, disable_exchange_declaration
+        )
 
 
 def event_dispatcher(nameko_config, **kwargs):
     """ 返回一个用于分发 Nameko 事件的函数。
+
+    返回的函数还带有 ``many`` 属性，用于在同一通道上批量分发多个同类型的事件，
+    参见 :meth:`nameko.amqp.publish.Publisher.publish_many` 。
     """
     amqp_uri = nameko_config[AMQP_URI_CONFIG_KEY]
 
@@ -56,4 +75,20 @@ def event_dispatcher(nameko_config, **kwargs):
             routing_key=event_type
         )
 
+    def dispatch_many(service_name, event_type, events_data, batch=64):
+        """ 分发多个声称来自 `service_name`、类型为 `event_type` 的事件，
+        `events_data` 中的每一项作为一个事件的数据。
+
+        所有事件共用一个通道，启用确认时每 `batch` 个事件才等待一次代理的确认。
+        """
+        exchange = get_event_exchange(service_name, nameko_config)
+
+        publisher.publish_many(
+            events_data,
+            batch=batch,
+            exchange=exchange,
+            routing_key=event_type
+        )
+
+    dispatch.many = dispatch_many
     return dispatch
@@ -2,6 +2,7 @@ from __future__ import absolute_import, annotations
 
 import logging
 import socket
+import time
 from typing import Dict
 
 from amqp.exceptions import ConnectionError
@@ -27,11 +28,14 @@ _logger = logging.getLogger(__name__)
 class ConsumeEvent(object):
     """具有与 eventlet.Event 相同接口的 RPC 消费者的事件。"""
 
-    exception = None
+    # 每次 RPC 调用都会创建一个实例，且在等待响应期间一直保留
+    __slots__ = ("correlation_id", "queue_consumer", "body", "exception")
 
     def __init__(self, queue_consumer: PollingQueueConsumer, correlation_id: str):
         self.correlation_id = correlation_id
         self.queue_consumer = queue_consumer
+        self.body = None
+        self.exception = None
 
     def send(self, body):
         self.body = body
@@ -80,6 +84,9 @@ class PollingQueueConsumer(object):
 
     consumer = None
 
+    max_reconnects = 5
+    """ 等待单个响应期间，因连接错误重新建立消费者的最大次数 """
+
     def __init__(self, timeout=None):
         self.stopped = True
         self.timeout = timeout
@@ -135,33 +142,56 @@ class PollingQueueConsumer(object):
 
         self.replies[msg_correlation_id] = (body, message)
 
-    def get_message(self, correlation_id):
-        try:
-            while correlation_id not in self.replies:
-                self.consumer.connection.drain_events(timeout=self.timeout)
-
-            body, message = self.replies.pop(correlation_id)
-            self.provider.handle_message(body, message)
-
-        except socket.timeout:
-            # TODO: 这将RPC超时与套接字读取超时混淆。如果RPC超时尚未达到，更好的RPC代理实现应该能够从套接字超时中恢复。
-            timeout_error = RpcTimeout(self.timeout)
-            event = self.provider._reply_events.pop(correlation_id)
-            event.send_exception(timeout_error)
-
-            # 超时是通过套接字超时实现的，因此当超时发生时，连接会被关闭并必须重新建立。
-            self._setup_consumer()
+    def _send_timeout(self, correlation_id):
+        timeout_error = RpcTimeout(self.timeout)
+        event = self.provider._reply_events.pop(correlation_id)
+        event.send_exception(timeout_error)
 
-        except (IOError, ConnectionError):
-            # 如果这是一个临时错误，尝试重新连接并重试。如果我们无法重新连接，错误将被抛出。
-            self._setup_consumer()
-            self.get_message(correlation_id)
+    def get_message(self, correlation_id):
+        # RPC 超时是整个等待过程的截止时间：期间收到其他调用的响应不会重新开始计时
+        deadline = None
+        if self.timeout is not None:
+            deadline = time.monotonic() + self.timeout
 
-        except KeyboardInterrupt as exc:
-            event = self.provider._reply_events.pop(correlation_id)
-            event.send_exception(exc)
-            # exception may have killed the connection
-            self._setup_consumer()
+        reconnects = 0
+        while True:
+            try:
+                while correlation_id not in self.replies:
+                    timeout = None
+                    if deadline is not None:
+                        timeout = deadline - time.monotonic()
+                        if timeout <= 0:
+                            # 套接字读取并未超时，连接仍然可用，无需重新建立消费者
+                            self._send_timeout(correlation_id)
+                            return
+                    self.consumer.connection.drain_events(timeout=timeout)
+
+                body, message = self.replies.pop(correlation_id)
+                self.provider.handle_message(body, message)
+                return
+
+            except socket.timeout:
+                # TODO: 这将RPC超时与套接字读取超时混淆。如果RPC超时尚未达到，更好的RPC代理实现应该能够从套接字超时中恢复。
+                self._send_timeout(correlation_id)
+
+                # 超时是通过套接字超时实现的，因此当超时发生时，连接会被关闭并必须重新建立。
+                self._setup_consumer()
+                return
+
+            except (IOError, ConnectionError):
+                # 如果这是一个临时错误，尝试重新连接并重试。如果我们无法重新连接，错误将被抛出。
+                # 连续失败超过 `max_reconnects` 次时，同样抛出最后一次的错误
+                reconnects += 1
+                if reconnects > self.max_reconnects:
+                    raise
+                self._setup_consumer()
+
+            except KeyboardInterrupt as exc:
+                event = self.provider._reply_events.pop(correlation_id)
+                event.send_exception(exc)
+                # exception may have killed the connection
+                self._setup_consumer()
+                return
 
 
 class SingleThreadedReplyListener(ReplyListener):
@@ -298,16 +328,23 @@ class ClusterProxy(object):
 
         self._proxies = {}
 
-    def __getattr__(self, name):
-        if name not in self._proxies:
-            self._proxies[name] = ServiceProxy(
+    def _get_service_proxy(self, name):
+        proxy = self._proxies.get(name)
+        if proxy is None:
+            proxy = self._proxies[name] = ServiceProxy(
                 self._worker_ctx, name, self._reply_listener
             )
-        return self._proxies[name]
+        return proxy
+
+    def __getattr__(self, name):
+        if name == "_proxies":
+            # 尚未初始化（例如复制或反序列化时），避免无限递归
+            raise AttributeError(name)
+        return self._get_service_proxy(name)
 
     def __getitem__(self, name):
         """Enable dict-like access on the proxy."""
-        return getattr(self, name)
+        return self._get_service_proxy(name)
 
 
 class ClusterRpcProxy(StandaloneProxyBase):
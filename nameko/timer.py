@@ -1,11 +1,11 @@
 from __future__ import absolute_import
 
-import itertools
 import time
 from logging import getLogger
 
 from eventlet import Timeout
 from eventlet.event import Event
+from eventlet.semaphore import Semaphore
 
 from nameko.extensions import Entrypoint
 
@@ -36,7 +36,8 @@ class Timer(Entrypoint):
         self.interval = interval
         self.eager = eager
         self.should_stop = Event()
-        self.worker_complete = Event()
+        # 每次触发后等待工作线程完成；信号量无需在两次触发之间重置
+        self.worker_complete = Semaphore(0)
         self.gt = None
         super(Timer, self).__init__(**kwargs)
 
@@ -56,14 +57,13 @@ class Timer(Entrypoint):
     def _run(self):
         """运行间隔循环。"""
 
-        def get_next_interval():
-            start_time = time.time()
-            start = 0 if self.eager else 1
-            for count in itertools.count(start=start):
-                yield max(start_time + count * self.interval - time.time(), 0)
+        # 第 n 次触发的时间点为 `起始时间 + n * interval` ，使用单调时钟，不受系统时间调整的影响
+        interval = self.interval
+        deadline = time.monotonic()
+        if not self.eager:
+            deadline += interval
 
-        interval = get_next_interval()
-        sleep_time = next(interval)
+        sleep_time = max(deadline - time.monotonic(), 0)
         while True:
             # 睡眠 `sleep_time`，除非 `should_stop` 被触发，此时我们将离开 while 循环并完全停止
             with Timeout(sleep_time, exception=False):
@@ -72,10 +72,10 @@ class Timer(Entrypoint):
 
             self.handle_timer_tick()
 
-            self.worker_complete.wait()
-            self.worker_complete.reset()
+            self.worker_complete.acquire()
 
-            sleep_time = next(interval)
+            deadline += interval
+            sleep_time = max(deadline - time.monotonic(), 0)
 
     def handle_timer_tick(self):
         args = ()
@@ -89,7 +89,7 @@ class Timer(Entrypoint):
         )
 
     def handle_result(self, worker_ctx, result, exc_info):
-        self.worker_complete.send()
+        self.worker_complete.release()
         return result, exc_info
 
 
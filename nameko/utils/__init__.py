@@ -1,7 +1,8 @@
+import builtins
+import importlib
 import inspect
 import re
 from copy import deepcopy
-from pydoc import locate
 
 from typing import Any
 
@@ -11,6 +12,49 @@ from six.moves.urllib.parse import urlparse
 
 REDACTED = "********"
 
+_SENSITIVE_PATH_RE = re.compile(r"(\w+)|\[(\d+)\]")
+
+
+def _parse_sensitive_arguments(sensitive_arguments):
+    """将 ``sensitive_arguments`` 解析为键路径元组。"""
+    paths = []
+    for variable in sensitive_arguments:
+        keys = []
+        for dict_key, list_index in _SENSITIVE_PATH_RE.findall(variable):
+            if dict_key:
+                keys.append(dict_key)
+            elif list_index:
+                keys.append(int(list_index))
+        if keys:
+            paths.append(tuple(keys))
+    return tuple(paths)
+
+
+def _get_redaction_plan(entrypoint):
+    """返回入口点方法的签名以及解析后的键路径。
+
+    结果缓存在入口点上；若服务方法（例如在测试中被 patch）或 ``sensitive_arguments``
+    被替换，则重新解析。
+    """
+    method = getattr(entrypoint.container.service_cls, entrypoint.method_name)
+    sensitive_arguments = entrypoint.sensitive_arguments
+    cached = entrypoint._sensitive_paths
+    if (
+        cached is not None and
+        cached[0] is method and
+        cached[1] is sensitive_arguments
+    ):
+        return cached[2], cached[3]
+
+    # 与 `inspect.getcallargs` 一致，不跟随 `__wrapped__` 解析被装饰的原函数
+    signature = inspect.signature(method, follow_wrapped=False)
+    if isinstance(sensitive_arguments, six.string_types):
+        paths = _parse_sensitive_arguments((sensitive_arguments,))
+    else:
+        paths = _parse_sensitive_arguments(sensitive_arguments)
+    entrypoint._sensitive_paths = (method, sensitive_arguments, signature, paths)
+    return signature, paths
+
 
 def get_redacted_args(entrypoint, *args, **kwargs):
     """
@@ -64,16 +108,13 @@ def get_redacted_args(entrypoint, *args, **kwargs):
 
         该实用程序的测试演示了其完整用法： :class:`test.test_utils.TestGetRedactedArgs` 。
     """
-    sensitive_arguments = entrypoint.sensitive_arguments
-    if isinstance(sensitive_arguments, six.string_types):
-        sensitive_arguments = (sensitive_arguments,)
+    signature, paths = _get_redaction_plan(entrypoint)
 
-    method = getattr(entrypoint.container.service_cls, entrypoint.method_name)
-    callargs = inspect.getcallargs(method, None, *args, **kwargs)
+    bound = signature.bind(None, *args, **kwargs)
+    bound.apply_defaults()
+    callargs = dict(bound.arguments)
     del callargs["self"]
 
-    # make a deepcopy before redacting so that "partial" redacations aren't applied to a referenced object
-
     # 在进行敏感参数隐去之前，先执行深拷贝，以确保“部分”隐去不会应用于被引用的对象。
     callargs = deepcopy(callargs)
 
@@ -88,14 +129,7 @@ def get_redacted_args(entrypoint, *args, **kwargs):
             if key in data:
                 redact(data[key], keys[1:])
 
-    for variable in sensitive_arguments:
-        keys = []
-        for dict_key, list_index in re.findall(r"(\w+)|\[(\d+)\]", variable):
-            if dict_key:
-                keys.append(dict_key)
-            elif list_index:
-                keys.append(int(list_index))
-
+    for keys in paths:
         if keys[0] in callargs:
             redact(callargs, keys)
 
@@ -110,7 +144,31 @@ def import_from_path(path) -> Any:
     if path is None:
         return
 
-    obj = locate(path)
+    # 与 `pydoc.locate` 一样，从左到右导入尽可能长的模块前缀，其余部分作为属性查找；
+    # 没有可导入的模块时从内置对象中查找
+    parts = path.split(".")
+    obj = builtins
+    index = 0
+    while index < len(parts):
+        module_path = ".".join(parts[: index + 1])
+        try:
+            obj = importlib.import_module(module_path)
+        except ImportError as exc:
+            # 模块本身存在但导入时出错（例如缺少依赖）时，抛出原始异常
+            if exc.name != module_path:
+                raise
+            break
+        except ValueError:  # 空的模块名
+            break
+        index += 1
+
+    try:
+        for part in parts[index:]:
+            obj = getattr(obj, part)
+    except AttributeError:
+        obj = None
+
+    # 与 `pydoc.locate` 一致，值为 `None` 的属性同样视为无法导入
     if obj is None:
         raise ImportError("`{}` could not be imported".format(path))
 
@@ -119,6 +177,9 @@ def import_from_path(path) -> Any:
 
 def sanitize_url(url):
     """在 URLs 中隐藏密码。"""
+    # 只有带用户信息（`user:password@host`）的 URL 才可能包含密码，无需解析其他 URL
+    if "@" not in url:
+        return url
     parts = urlparse(url)
     if parts.password is None:
         return url
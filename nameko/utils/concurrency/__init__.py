@@ -3,6 +3,7 @@ from __future__ import annotations
 import sys
 
 from typing import (
+    Dict,
     List,
     Type,
     Iterable,
@@ -15,6 +16,7 @@ from typing import (
     TypeVar,
     Set,
     Union,
+    Optional,
 )
 
 import nameko.containers
@@ -39,29 +41,34 @@ def fail_fast_imap(
     :type pool: eventlet.greenpool.GreenPool
     :param call: 要调用的函数，期望从给定列表中接收一个项
     """
-    result_queue = LightQueue(maxsize=len(items))  # type: ignore
-    spawned_threads = set()
+    # 不限制队列大小，`items` 只需遍历一次，无需支持 `len` （例如生成器）
+    result_queue = LightQueue()
+    # 仅在出错时用于终止其他线程；回调中不修改共享状态，只投递结果
+    spawned_threads = []
 
     def handle_result(finished_thread):
         try:
             thread_result = finished_thread.wait()
-            spawned_threads.remove(finished_thread)
             result_queue.put((thread_result, None))
         except Exception:
-            spawned_threads.remove(finished_thread)
             result_queue.put((None, sys.exc_info()))
 
+    # 按已入队但尚未取出的结果计数
+    pending = 0
     for item in items:
         gt = pool.spawn(call, item)
-        spawned_threads.add(gt)
+        spawned_threads.append(gt)
         gt.link(handle_result)
+        pending += 1
 
-    while spawned_threads:
+    while pending:
         result, exc_info = result_queue.get()
+        pending -= 1
         if exc_info is not None:
             # 终止所有其他正在进行的线程。
             for ongoing_thread in spawned_threads:
-                ongoing_thread.kill()
+                if not ongoing_thread.dead:
+                    ongoing_thread.kill()
             # 仅在此处抛出异常（即使抛出完整的 exc_info）也不足以保留原始的堆栈跟踪。
             # 使用 `greenlet.throw()` 可以实现这一点。
             eventlet.getcurrent().throw(*exc_info)
@@ -92,8 +99,32 @@ class SpawningProxy(object):
         """
         self._items = items
         self.abort_on_error: bool = abort_on_error
+        self._pool: Optional[eventlet.GreenPool] = None
+        self._methods: Dict[str, Callable] = {}
+
+    def _get_pool(self, size: int) -> eventlet.GreenPool:
+        """获取用于广播调用的协程池
+
+        同一个代理上的连续调用（例如先 ``setup()`` 再 ``start()`` ）复用同一个池；
+        仅当池的大小不足或仍有线程在运行时才创建新的池。
+        """
+        pool = self._pool
+        if pool is None or pool.size < size or pool.running():
+            pool = self._pool = eventlet.GreenPool(size)
+        return pool
 
     def __getattr__(self, name: str):
+        if name == "_methods":
+            # 尚未初始化（例如复制或反序列化时），避免无限递归
+            raise AttributeError(name)
+
+        # 同一代理上的同名广播方法只创建一次（例如 ``.all.stop()`` 与 ``.all.kill()`` ）
+        method = self._methods.get(name)
+        if method is None:
+            method = self._methods[name] = self._make_spawning_method(name)
+        return method
+
+    def _make_spawning_method(self, name: str):
         def spawning_method(*args, **kwargs) -> List[eventlet.greenthread.GreenThread]:
             """
 
@@ -102,8 +133,8 @@ class SpawningProxy(object):
             items = self._items
 
             if items:
-                # 创建一个协程池，池的大小等于 items 的数量。
-                pool = eventlet.GreenPool(len(items))  # type: ignore
+                # 获取一个协程池，池的大小至少等于 items 的数量。
+                pool = self._get_pool(len(items))  # type: ignore
 
                 def call(item: Type):
                     """内部定义了一个小函数 call, 它用于在每个 item 对象上调用对应的方法 name, 并传入之前的参数。"""
@@ -114,8 +145,12 @@ class SpawningProxy(object):
                     return list(fail_fast_imap(pool, call, self._items))
 
                 else:
-                    # 通过 GreenPool 对 items 集合进行并行处理。
-                    return list(pool.imap(call, self._items))
+                    # 在缓存的协程池上并行处理 items 集合，按顺序收集结果。
+                    # （ ``pool.imap`` 内部会另建一个同样大小的池，无法复用此池）
+                    pile = eventlet.GreenPile(pool)
+                    for item in self._items:
+                        pile.spawn(call, item)
+                    return list(pile)
 
             # 应该永远不会走到这，除非在服务（Service）为 0 的情况下启动该命令
             return []
@@ -126,6 +161,13 @@ class SpawningProxy(object):
 class SpawningSet(Set[SpawningProxy]):
     """一个具有 ``.all`` 属性的集合，该属性将在集合中的每个项上生成一个方法调用，每个调用都会在其自己的（并行）绿色线程中执行。"""
 
+    _proxy: Optional[SpawningProxy] = None
+
     @property
     def all(self):
-        return SpawningProxy(self)
+        # 代理引用集合本身，集合的变化对其可见；缓存代理以便各次广播调用复用同一个协程池。
+        # 通过 `copy` 复制的集合会带上原集合的代理，此时重新创建
+        proxy = self._proxy
+        if proxy is None or proxy._items is not self:
+            proxy = self._proxy = SpawningProxy(self)
+        return proxy
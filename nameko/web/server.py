@@ -6,13 +6,16 @@ from logging import getLogger
 
 import eventlet
 from eventlet import wsgi
+from eventlet.semaphore import Semaphore
 from eventlet.support import get_errno
 from eventlet.wsgi import BROKEN_SOCK, BaseHTTPServer, HttpProtocol
-from werkzeug.exceptions import HTTPException
+from werkzeug.exceptions import HTTPException, NotFound
 from werkzeug.routing import Map
 from werkzeug.wrappers import Request
 
-from nameko.constants import WEB_SERVER_CONFIG_KEY
+from nameko.constants import (
+    WEB_MAX_CONNECTIONS_CONFIG_KEY, WEB_SERVER_CONFIG_KEY
+)
 from nameko.exceptions import ConfigurationError
 from nameko.extensions import ProviderCollector, SharedExtension
 
@@ -25,10 +28,12 @@ except AttributeError:  # pragma: no cover
 
 BindAddress = namedtuple("BindAddress", ['address', 'port'])
 
+_ADDRESS_RE = re.compile(r'^((?P<address>[^:]+):)?(?P<port>\d+)$')
+_NON_ASCII_RE = re.compile(r'[^\x00-\x7f]')
+
 
 def parse_address(address_string):
-    address_re = re.compile(r'^((?P<address>[^:]+):)?(?P<port>\d+)$')
-    match = address_re.match(address_string)
+    match = _ADDRESS_RE.match(address_string)
     if match is None:
         raise ConfigurationError(
             'Misconfigured bind address `{}`. '
@@ -67,26 +72,53 @@ class WebServer(ProviderCollector, SharedExtension):
         self._serv = None
         self._starting = False
         self._is_accepting = True
+        self._bind_addr = None
+        self._connection_limiter = None
 
     @property
     def bind_addr(self):
         address_str = self.container.config.get(
             WEB_SERVER_CONFIG_KEY, '0.0.0.0:8000')
-        return parse_address(address_str)
+        # 以配置字符串为键缓存解析结果，配置被修改后会重新解析
+        cached = self._bind_addr
+        if cached is None or cached[0] != address_str:
+            cached = (address_str, parse_address(address_str))
+            self._bind_addr = cached
+        return cached[1]
 
     def run(self):
+        limiter = self._connection_limiter
         while self._is_accepting:
-            sock, addr = self._sock.accept()
-            sock.settimeout(self._serv.socket_timeout)
-            self.container.spawn_managed_thread(
-                partial(self.process_request, sock, addr)
-            )
+            if limiter is not None:
+                # 达到上限时不再接受新连接，让其留在内核的监听队列中
+                limiter.acquire()
+            try:
+                sock, addr = self._sock.accept()
+                handler = partial(self.process_request, sock, addr)
+                if limiter is None:
+                    # 不需要每个连接的线程句柄
+                    self.container.spawn_managed_thread_n(handler)
+                    continue
+                gt = self.container.spawn_managed_thread(handler)
+            except BaseException:
+                # 连接线程没有生成，由这里归还名额
+                if limiter is not None:
+                    limiter.release()
+                raise
+            # 通过回调归还名额：线程在开始运行前就被终止（例如容器被 kill）时同样会触发
+            gt.link(self._release_connection_permit)
+
+    def _release_connection_permit(self, gt):
+        self._connection_limiter.release()
 
     def process_request(self, sock, address):
         try:
+            # 在连接自己的线程中设置超时，让接受循环尽快回到 `accept`
+            sock.settimeout(self._serv.socket_timeout)
             if STATE_IDLE:  # pragma: no cover
                 # eventlet >= 0.22
                 # see https://github.com/eventlet/eventlet/issues/420
+                # eventlet 会原地修改连接状态列表，因此每个连接都需要新的列表
                 self._serv.process_request([address, sock, STATE_IDLE])
             else:  # pragma: no cover
                 self._serv.process_request((sock, address))
@@ -103,6 +135,10 @@ class WebServer(ProviderCollector, SharedExtension):
     def start(self):
         if not self._starting:
             self._starting = True
+            max_connections = self.container.config.get(
+                WEB_MAX_CONNECTIONS_CONFIG_KEY)
+            if max_connections:
+                self._connection_limiter = Semaphore(max_connections)
             self._sock = eventlet.listen(self.bind_addr)
             # work around https://github.com/celery/kombu/issues/838
             self._sock.settimeout(None)
@@ -152,8 +188,61 @@ class WsgiApp(object):
     def __init__(self, server):
         self.server = server
         self.url_map = server.make_url_map()
+        self._static_routes = self._make_static_routes(self.url_map)
+        self._known_paths = self._make_known_paths(self.url_map)
+
+    @staticmethod
+    def _make_static_routes(url_map):
+        """为不含参数的静态规则建立 ``(method, path)`` 索引。
+
+        werkzeug 总是先于动态规则尝试静态规则，因此精确命中时返回的
+        provider 与 ``adapter.match()`` 相同；带有默认值、子域名、重定向
+        或 WebSocket 标记的规则仍交由 werkzeug 处理。
+
+        索引键采用 WSGI 形式（UTF-8 字节按 latin-1 解码），与未经解码的
+        ``PATH_INFO`` 直接比较。
+        """
+        routes = {}
+        for rule in url_map.iter_rules():
+            if (
+                rule.arguments or rule.defaults or rule.methods is None or
+                rule.websocket or rule.build_only or
+                rule.redirect_to is not None or rule.subdomain or rule.host
+            ):
+                continue
+            path = rule.rule.encode('utf-8').decode('latin-1')
+            for method in rule.methods:
+                routes.setdefault((method, path), rule.endpoint)
+        return routes
+
+    @staticmethod
+    def _make_known_paths(url_map):
+        """当所有规则都是字面路径时，返回这些路径的集合，否则返回 ``None``。
+
+        此时不在集合中的路径必然得到 404，无需创建 `Request` 和 adapter。
+        """
+        paths = set()
+        for rule in url_map.iter_rules():
+            if rule.arguments or rule.subdomain or rule.host:
+                return None
+            paths.add(rule.rule)
+        return frozenset(paths)
+
+    def _is_unknown_path(self, path):
+        # 末尾缺少斜杠或包含连续斜杠的路径会被 werkzeug 重定向，非 ASCII 路径
+        # 需要先解码，这些情况都交由 werkzeug 处理
+        known_paths = self._known_paths
+        return (
+            known_paths is not None and path.startswith('/') and
+            '//' not in path and path not in known_paths and
+            path + '/' not in known_paths and not _NON_ASCII_RE.search(path)
+        )
 
     def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if self._is_unknown_path(path):
+            return NotFound()(environ, start_response)
+
         # 设置为浅模式，以便在未取消之前，任何人都无法读取请求数据。
         # 这使得在所有情况下，如果需要，可以将连接升级为双向 WebSocket 连接。
         # 常规请求处理代码会自动取消此标志。
@@ -161,9 +250,17 @@ class WsgiApp(object):
         # 如果我们不这样做，某些代码可能会在此之前访问表单数据，
         # 这可能导致死锁，因为此时浏览器不再从我们的套接字读取数据。
         request = Request(environ, shallow=True)
-        adapter = self.url_map.bind_to_environ(environ)
+        provider = None
+        if 'HTTP_UPGRADE' not in environ:
+            provider = self._static_routes.get((
+                environ.get('REQUEST_METHOD', 'GET').upper(), path
+            ))
         try:
-            provider, values = adapter.match()
+            if provider is None:
+                adapter = self.url_map.bind_to_environ(environ)
+                provider, values = adapter.match()
+            else:
+                values = {}
             request.path_values = values
             rv = provider.handle_request(request)
         except HTTPException as exc:
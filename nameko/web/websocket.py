@@ -4,7 +4,6 @@ from collections import namedtuple
 from functools import partial
 from logging import getLogger
 
-import six
 import werkzeug
 from eventlet.event import Event
 from eventlet.websocket import WebSocketWSGI
@@ -48,6 +47,20 @@ class WebSocketServer(SharedExtension, ProviderCollector):
     def __init__(self):
         super(WebSocketServer, self).__init__()
         self.sockets = {}
+        # 方法名 -> WebSocketRpc 提供者，每个入站帧都以此查找，而不是逐个扫描提供者
+        self._rpc_providers = {}
+
+    def register_provider(self, provider):
+        super(WebSocketServer, self).register_provider(provider)
+        if isinstance(provider, WebSocketRpc):
+            self._rpc_providers[provider.method_name] = provider
+
+    def unregister_provider(self, provider):
+        super(WebSocketServer, self).unregister_provider(provider)
+        if isinstance(provider, WebSocketRpc):
+            method_name = provider.method_name
+            if self._rpc_providers.get(method_name) is provider:
+                del self._rpc_providers[method_name]
 
     def deserialize_ws_frame(self, payload):
         try:
@@ -61,7 +74,7 @@ class WebSocketServer(SharedExtension, ProviderCollector):
             raise MalformedRequest('Invalid JSON data')
 
     def serialize_for_ws(self, payload):
-        return six.text_type(json.dumps(payload))
+        return json.dumps(payload)
 
     def serialize_event(self, event, data):
         return self.serialize_for_ws({
@@ -122,13 +135,10 @@ class WebSocketServer(SharedExtension, ProviderCollector):
         return self.serialize_for_ws(response)
 
     def get_provider_for_method(self, method):
-        for provider in self._providers:
-            if (
-                isinstance(provider, WebSocketRpc) and
-                provider.method_name == method
-            ):
-                return provider
-        raise MethodNotFound()
+        try:
+            return self._rpc_providers[method]
+        except (KeyError, TypeError):  # TypeError: 不可哈希的方法名
+            raise MethodNotFound()
 
     def setup(self):
         self.wsgi_server.register_provider(self)
@@ -222,7 +232,8 @@ class WebSocketHub(object):
     def broadcast(self, channel, event, data):
         """向所有在频道上监听的套接字广播事件。"""
         payload = self._server.serialize_event(event, data)
-        for socket_id in self.subscriptions.get(channel, ()):
+        # 发送时可能切换到其他绿色线程并修改订阅，因此遍历订阅集合的快照
+        for socket_id in tuple(self.subscriptions.get(channel, ())):
             rv = self._server.sockets.get(socket_id)
             if rv is not None:
                 rv.socket.send(payload)
@@ -1,5 +1,7 @@
 from __future__ import absolute_import
 
+import socket
+from collections import defaultdict
 from time import time
 
 import kombu
@@ -10,7 +12,7 @@ from amqp.exceptions import (
 from kombu import Connection
 from kombu.common import maybe_declare
 from kombu.compression import get_encoder
-from kombu.exceptions import OperationalError
+from kombu.exceptions import ChannelError, OperationalError
 from kombu.messaging import Exchange, Producer, Queue
 from kombu.serialization import registry
 from mock import ANY, MagicMock, Mock, call, patch
@@ -18,7 +20,8 @@ from packaging import version
 from six.moves import queue
 
 from nameko.amqp.publish import (
-    Publisher, UndeliverableMessage, get_connection, get_producer
+    PublishConfirmTimeout, Publisher, UndeliverableMessage, get_connection,
+    get_producer
 )
 from nameko.constants import AMQP_SSL_CONFIG_KEY
 
@@ -40,6 +43,23 @@ def test_get_connection(rabbit_config):
         assert len(set(connection_ids)) == 1
 
 
+def test_get_connection_reuses_pool_key():
+    with patch('nameko.amqp.publish.connections') as connections:
+        with get_connection("memory://"):
+            pass
+        with get_connection("memory://"):
+            pass
+        with get_connection("memory://", ssl={'cert_reqs': 2}):
+            pass
+
+    (conn1,), (conn2,), (conn3,) = [
+        args for args, _ in connections.__getitem__.call_args_list
+    ]
+    assert conn1 is conn2
+    assert conn1 is not conn3
+    assert conn3.ssl == {'cert_reqs': 2}
+
+
 class TestGetProducer(object):
 
     @pytest.fixture(params=[True, False])
@@ -80,6 +100,29 @@ class TestGetProducer(object):
             assert len(set(producer_ids)) == 2  # different producer returned
 
 
+def test_get_producer_released_on_error():
+    with get_producer("memory://") as producer:
+        pass
+
+    with pytest.raises(ValueError):
+        with get_producer("memory://") as failed_producer:
+            raise ValueError("boom")
+
+    with get_producer("memory://") as next_producer:
+        # each use returned the producer to the pool
+        assert producer is failed_producer is next_producer
+
+
+@pytest.mark.parametrize("confirms", [True, False])
+def test_confirm_flag_is_part_of_pool_key(confirms):
+    with patch('nameko.amqp.publish.producers') as producers:
+        with get_producer("memory://", confirms):
+            pass
+
+    (conn,), _ = producers.__getitem__.call_args
+    assert conn.transport_options['confirm_publish'] is confirms
+
+
 class TestPublisherConfirms(object):
     """ Publishing to a non-existent exchange raises if confirms are enabled.
     """
@@ -359,6 +402,16 @@ class TestPublisher(object):
         with pytest.raises(PreconditionFailed):
             publisher.publish("payload", user_id="invalid")
 
+    def test_publish_many(
+        self, publisher, get_message_from_queue, queue
+    ):
+        publisher.publish_many(["a", "b", "c"], batch=2)
+
+        payloads = [
+            get_message_from_queue(queue.name).payload for _ in range(3)
+        ]
+        assert payloads == ["a", "b", "c"]
+
     @patch('kombu.messaging.maybe_declare', wraps=maybe_declare)
     def test_declare(
         self, maybe_declare, publisher, get_message_from_queue, routing_key,
@@ -434,6 +487,154 @@ class TestPublisher(object):
         assert mock_publish.call_count == expected_publish_calls
 
 
+class TestPublishMany(object):
+
+    @pytest.fixture
+    def connection(self):
+        with patch('nameko.amqp.publish.get_connection') as get_connection:
+            yield get_connection.return_value.__enter__.return_value
+
+    @pytest.fixture
+    def channel(self, connection):
+        channel = connection.channel.return_value
+        channel.events = defaultdict(set)
+        return channel
+
+    @pytest.fixture
+    def producer(self):
+        with patch('nameko.amqp.publish.Producer') as producer_cls:
+            yield producer_cls.return_value
+
+    def test_confirms_awaited_per_batch(self, connection, channel, producer):
+        published = []
+        producer.publish.side_effect = (
+            lambda payload, **kwargs: published.append(payload)
+        )
+
+        def drain_events(timeout=None):
+            # broker acknowledges everything published so far in one frame
+            for callback in channel.events['basic_ack']:
+                callback(len(published), True)
+
+        connection.drain_events.side_effect = drain_events
+
+        publisher = Publisher("memory://")
+        publisher.publish_many(range(5), batch=2)
+
+        assert published == [0, 1, 2, 3, 4]
+        assert connection.drain_events.call_count == 3
+        assert channel.confirm_select.call_count == 1
+        assert producer.publish.call_args[1]['retry'] is False
+        channel.close.assert_called_once_with()
+
+    def test_nacked_messages_are_republished(
+        self, connection, channel, producer
+    ):
+        def drain_events(timeout=None):
+            for callback in channel.events['basic_nack']:
+                callback(2, False)
+            for callback in channel.events['basic_ack']:
+                callback(3, True)
+
+        connection.drain_events.side_effect = drain_events
+
+        publisher = Publisher("memory://")
+        with patch.object(publisher, 'publish') as publish:
+            publisher.publish_many(["a", "b", "c"], priority=1)
+
+        assert producer.publish.call_count == 3
+        assert publish.call_args_list == [call("b", priority=1)]
+
+    @pytest.mark.parametrize('batch', [0, -1])
+    def test_invalid_batch(self, producer, batch):
+        publisher = Publisher("memory://")
+        with pytest.raises(ValueError):
+            publisher.publish_many(["a", "b"], batch=batch)
+        assert not producer.publish.called
+
+    def test_confirm_timeout(self, connection, channel, producer):
+        # the broker never acks or nacks
+        connection.drain_events.side_effect = socket.timeout
+
+        publisher = Publisher("memory://")
+        with patch('nameko.amqp.publish.time') as mock_time:
+            mock_time.monotonic.side_effect = [0, 0, 0.5, 1]
+            with pytest.raises(PublishConfirmTimeout) as exc_info:
+                publisher.publish_many(["a", "b"], confirm_timeout=1)
+
+        assert str(exc_info.value) == "2 message(s) not confirmed after 1s"
+        assert connection.drain_events.call_args_list == [
+            call(timeout=1), call(timeout=0.5)
+        ]
+        channel.close.assert_called_once_with()
+
+    def test_all_nacked_messages_are_republished_in_order(
+        self, connection, channel, producer
+    ):
+        published = []
+        producer.publish.side_effect = (
+            lambda payload, **kwargs: published.append(payload)
+        )
+
+        def drain_events(timeout=None):
+            # broker rejects everything published so far in one frame
+            for callback in channel.events['basic_nack']:
+                callback(len(published), True)
+
+        connection.drain_events.side_effect = drain_events
+
+        publisher = Publisher("memory://")
+        with patch.object(publisher, 'publish') as publish:
+            publisher.publish_many(["a", "b", "c", "d", "e"], batch=4)
+
+        # each rejected message is republished exactly once
+        assert publish.call_args_list == [
+            call("a"), call("b"), call("c"), call("d"), call("e")
+        ]
+
+    @pytest.mark.parametrize('error', [
+        ChannelError("NO_ROUTE"), socket.timeout
+    ])
+    def test_close_error_does_not_mask_original(
+        self, connection, channel, producer, error
+    ):
+        if error is socket.timeout:
+            connection.drain_events.side_effect = error
+            expected = PublishConfirmTimeout
+        else:
+            producer.publish.side_effect = error
+            expected = UndeliverableMessage
+        channel.close.side_effect = IOError("channel already broken")
+
+        publisher = Publisher("memory://")
+        with pytest.raises(expected):
+            publisher.publish_many(["a"], confirm_timeout=0.01)
+        channel.close.assert_called_once_with()
+
+    def test_close_error_raised_after_success(
+        self, connection, channel, producer
+    ):
+        def drain_events(timeout=None):
+            for callback in channel.events['basic_ack']:
+                callback(1, True)
+
+        connection.drain_events.side_effect = drain_events
+        channel.close.side_effect = IOError("boom")
+
+        publisher = Publisher("memory://")
+        with pytest.raises(IOError):
+            publisher.publish_many(["a"])
+
+    def test_confirms_disabled(self):
+        publisher = Publisher("memory://")
+        with patch.object(publisher, 'publish') as publish:
+            publisher.publish_many(["a", "b"], use_confirms=False)
+
+        assert publish.call_args_list == [
+            call("a", use_confirms=False), call("b", use_confirms=False)
+        ]
+
+
 class TestDefaults(object):
 
     @pytest.fixture
@@ -506,6 +707,18 @@ class TestDefaults(object):
         publisher.publish("payload", declare=[queue3])
         assert producer.publish.call_args[1]["declare"] == [queue1, queue3]
 
+    def test_declarations_not_mutated(self, producer):
+        queue1 = Mock()
+        publisher = Publisher("memory://", declare=[queue1])
+
+        publisher.publish("payload")
+        assert producer.publish.call_args[1]["declare"] == [queue1]
+
+        queue2 = Mock()
+        publisher.publish("payload", declare=(queue2,))
+        assert producer.publish.call_args[1]["declare"] == [queue1, queue2]
+        assert publisher.declare == [queue1]
+
     def test_publish_kwargs(self, producer):
         """ Verify that publish_kwargs at publish time augment any provided
         at instantiation time. Verify that publish_kwargs at publish time
@@ -538,3 +751,64 @@ class TestDefaults(object):
         publisher.publish("payload", use_confirms=True)
         use_confirms = get_producer.call_args[0][4].get('confirm_publish')
         assert use_confirms is True
+
+    def test_defaults_changed_after_instantiation(self, get_producer, producer):
+        """ Verify that defaults modified on the instance after it was created
+        are used by subsequent publishes.
+        """
+        publisher = Publisher("memory://")
+
+        publisher.publish("payload")
+        assert producer.publish.call_args[1]["priority"] == 0
+
+        publisher.priority = 5
+        publisher.transport_options = {'max_retries': 1}
+
+        publisher.publish("payload")
+        assert producer.publish.call_args[1]["priority"] == 5
+        assert get_producer.call_args[0][4] == {
+            'max_retries': 1, 'confirm_publish': True
+        }
+
+    def test_defaults_changed_in_place(self, get_producer, producer):
+        """ Verify that defaults are read on every publish, so in-place
+        changes and patched class attributes are picked up.
+        """
+        retry_policy = {'max_retries': 1}
+        publisher = Publisher(
+            "memory://", retry_policy=retry_policy, headers={'foo': 'bar'}
+        )
+        publisher.transport_options = {'max_retries': 1}
+
+        publisher.publish("payload")
+
+        retry_policy['max_retries'] = 2
+        publisher.publish_kwargs['headers']['foo'] = 'baz'
+        publisher.transport_options['max_retries'] = 5
+
+        with patch.object(Publisher, 'retry', False):
+            publisher.publish("payload")
+
+        publish_kwargs = producer.publish.call_args[1]
+        assert publish_kwargs['retry_policy'] == {'max_retries': 2}
+        assert publish_kwargs['headers'] == {'foo': 'baz'}
+        assert publish_kwargs['retry'] is False
+        assert get_producer.call_args[0][4]['max_retries'] == 5
+
+    def test_transport_options_not_mutated(self, get_producer):
+        """ Verify that publishing does not modify the transport options
+        declared on the class or passed at publish time.
+        """
+        original = Publisher.transport_options.copy()
+        publisher = Publisher("memory://", use_confirms=False)
+
+        publisher.publish("payload")
+        assert Publisher.transport_options == original
+        assert publisher.transport_options == original
+
+        transport_options = {'max_retries': 1}
+        publisher.publish("payload", transport_options=transport_options)
+        assert transport_options == {'max_retries': 1}
+        assert get_producer.call_args[0][4] == {
+            'max_retries': 1, 'confirm_publish': False
+        }
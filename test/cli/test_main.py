@@ -1,3 +1,4 @@
+import importlib
 import os
 import sys
 
@@ -67,6 +68,22 @@ def test_flag_action(param, value):
     assert parsed.rlwrap is value
 
 
+def test_import_without_regex_module():
+    import nameko.cli.main
+
+    try:
+        with patch.dict(sys.modules, {'regex': None}):
+            # reloading reuses the module namespace, so drop the old binding
+            vars(nameko.cli.main).pop('regex', None)
+            module = importlib.reload(nameko.cli.main)
+            assert module.has_regex_module is False
+            assert module.ENV_VAR_MATCHER.findall('${VAR_NAME:default}') == [
+                ('VAR_NAME', 'default')
+            ]
+    finally:
+        importlib.reload(nameko.cli.main)
+
+
 class TestConfigEnvironmentParser(object):
 
     @pytest.mark.parametrize(('value', 'expected'), [
@@ -141,6 +158,8 @@ class TestConfigEnvironmentVariables(object):
         ('FOO: "${BAR:foo}"', {'BAR': 'bar'}, {'FOO': '${BAR:foo}'}),
         # quoted values work only with explicit resolver
         ('FOO: !env_var "${BAR:foo}"', {'BAR': 'bar'}, {'FOO': 'bar'}),
+        # explicit resolver on a value without vars returns it unparsed
+        ('FOO: !env_var "123"', {}, {'FOO': '123'}),
         # quoted values with raw_env_var constructor to avoid yaml parsing
         ('FOO: !raw_env_var "${BAR}"', {'BAR': '123.0'}, {'FOO': '123.0'}),
         # $ sign can be used
@@ -330,6 +349,20 @@ class TestConfigEnvironmentVariables(object):
             results = yaml.safe_load(yaml_config)
             assert results == {'FOO': "${VAR1}", 'BAR': [1, 2, 3]}
 
+    @pytest.mark.skipif(not has_regex_module,
+                        reason='0 support for nested env without regex module')
+    def test_default_expansion_reaches_fixed_point(self):  # pragma: no cover
+        setup_yaml_parser()
+
+        yaml_config = """
+            FOO: ${MISSING:${VAR1}}
+            BAR: ${MISSING:${VAR2:${VAR3:3}}}
+        """
+
+        with patch.dict(os.environ, {"VAR1": "${VAR1}"}):
+            results = yaml.safe_load(yaml_config)
+            assert results == {'FOO': "${VAR1}", 'BAR': 3}
+
     @pytest.mark.parametrize(
         ("yaml_config", "should_match"),
         [
@@ -450,6 +483,14 @@ class TestConfigEnvironmentVariables(object):
                 {},
                 {"FOO": "{name} {age}"},
             ),
+            # flat env alongside a recursive one
+            (
+                """
+            FOO: ${HOST:localhost}-${PORT:${DEFAULT_PORT:80}}
+            """,
+                {"DEFAULT_PORT": "8080"},
+                {"FOO": "localhost-8080"},
+            ),
             # default data with bracket
             (
                 """
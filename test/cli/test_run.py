@@ -2,8 +2,10 @@ import errno
 import os
 import signal
 import socket
+import sys
 from os.path import abspath, dirname, join
 from textwrap import dedent
+from types import ModuleType
 
 import eventlet
 import pytest
@@ -15,6 +17,7 @@ from nameko.constants import (
     AMQP_URI_CONFIG_KEY, SERIALIZER_CONFIG_KEY, WEB_SERVER_CONFIG_KEY
 )
 from nameko.exceptions import CommandError
+from nameko.rpc import rpc
 from nameko.runners import ServiceRunner
 from nameko.standalone.rpc import ClusterRpcProxy
 from nameko.testing.waiting import wait_for_call
@@ -138,6 +141,27 @@ def test_import_ok():
     assert import_service('test.sample:Service') == [Service]
 
 
+def test_import_inherited_entrypoints():
+
+    class Base(object):
+        @rpc
+        def ping(self):
+            pass  # pragma: no cover
+
+    class Service(Base):
+        name = "service"
+
+    class NotAService(object):
+        pass
+
+    module = ModuleType("inherited_sample")
+    module.Service = Service
+    module.NotAService = NotAService
+
+    with patch.dict(sys.modules, {"inherited_sample": module}):
+        assert import_service('inherited_sample') == [Service]
+
+
 def test_import_missing():
     with pytest.raises(CommandError) as exc:
         import_service('non_existent')
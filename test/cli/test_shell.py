@@ -3,7 +3,7 @@ import subprocess
 import sys
 
 import pytest
-from mock import Mock, patch
+from mock import Mock, call, patch
 
 from nameko.cli.commands import Shell
 from nameko.cli.main import setup_parser
@@ -20,6 +20,45 @@ def test_helper_module(rabbit_config):
     helper.disconnect()
 
 
+def test_helper_module_creates_event_dispatcher_lazily():
+    config = {AMQP_URI_CONFIG_KEY: "memory://"}
+
+    with patch('nameko.cli.shell.ClusterRpcProxy'):
+        with patch('nameko.cli.shell.event_dispatcher') as event_dispatcher:
+            helper = make_nameko_helper(config)
+            assert not event_dispatcher.called
+
+            helper.dispatch_event('service', 'event_type', 'data1')
+            helper.dispatch_event('service', 'event_type', 'data2')
+
+    event_dispatcher.assert_called_once_with(config)
+    dispatch = event_dispatcher.return_value
+    assert dispatch.call_args_list == [
+        call('service', 'event_type', 'data1'),
+        call('service', 'event_type', 'data2'),
+    ]
+
+
+def test_helper_module_dispatches_many_events():
+    config = {AMQP_URI_CONFIG_KEY: "memory://"}
+
+    with patch('nameko.cli.shell.ClusterRpcProxy'):
+        with patch('nameko.cli.shell.event_dispatcher') as event_dispatcher:
+            helper = make_nameko_helper(config)
+            assert not event_dispatcher.called
+
+            helper.dispatch_event.many('service', 'event_type', ['a', 'b'])
+            helper.dispatch_event('service', 'event_type', 'c')
+
+    # both helpers share the one lazily created dispatcher
+    event_dispatcher.assert_called_once_with(config)
+    dispatch = event_dispatcher.return_value
+    assert dispatch.many.call_args_list == [
+        call('service', 'event_type', ['a', 'b'], batch=64),
+    ]
+    assert dispatch.call_args_list == [call('service', 'event_type', 'c')]
+
+
 @pytest.fixture
 def pystartup(tmpdir):
     startup = tmpdir.join('startup.py')
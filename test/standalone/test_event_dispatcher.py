@@ -6,6 +6,7 @@ from mock import Mock, patch
 from six.moves import queue
 
 from nameko.amqp import UndeliverableMessage
+from nameko.amqp.publish import Publisher
 from nameko.constants import LOGIN_METHOD_CONFIG_KEY
 from nameko.events import event_handler
 from nameko.standalone.events import event_dispatcher, get_event_exchange
@@ -37,6 +38,69 @@ def test_dispatch(container_factory, rabbit_config):
     handler_called.assert_called_once_with(msg)
 
 
+def test_dispatch_many_delivers(container_factory, rabbit_config):
+    config = rabbit_config
+
+    received = []
+
+    class Receiver(object):
+        name = 'receiver'
+
+        @event_handler('srcservice', 'batchevent')
+        def handler(self, msg):
+            received.append(msg)
+
+    container = container_factory(Receiver, config)
+    container.start()
+
+    dispatch = event_dispatcher(config)
+
+    def all_received(worker_ctx, result, exc_info):
+        return len(received) == 3
+
+    with entrypoint_waiter(
+        container, 'handler', callback=all_received, timeout=1
+    ):
+        dispatch.many('srcservice', 'batchevent', ["a", "b", "c"], batch=2)
+
+    assert sorted(received) == ["a", "b", "c"]
+
+
+def test_dispatch_shares_exchange_per_service(mock_producer):
+    config = {'AMQP_URI': 'memory://localhost'}
+
+    dispatch = event_dispatcher(config)
+
+    dispatch('srcservice', 'testevent', "msg")
+    dispatch('srcservice', 'testevent', "msg")
+    dispatch('otherservice', 'testevent', "msg")
+
+    exchanges = [
+        kwargs['exchange']
+        for _, kwargs in mock_producer.publish.call_args_list
+    ]
+    assert [exchange.name for exchange in exchanges] == [
+        'srcservice.events', 'srcservice.events', 'otherservice.events'
+    ]
+    # get_event_exchange returns the same instance for the same service
+    assert exchanges[0] is exchanges[1]
+
+
+def test_dispatch_many():
+    config = {'AMQP_URI': 'memory://localhost'}
+
+    dispatch = event_dispatcher(config)
+
+    with patch.object(Publisher, 'publish_many') as publish_many:
+        dispatch.many('srcservice', 'testevent', ["a", "b"], batch=10)
+
+    (payloads,), kwargs = publish_many.call_args
+    assert payloads == ["a", "b"]
+    assert kwargs['batch'] == 10
+    assert kwargs['routing_key'] == 'testevent'
+    assert kwargs['exchange'].name == 'srcservice.events'
+
+
 class TestMandatoryDelivery(object):
     """ Test and demonstrate mandatory delivery.
 
@@ -15,7 +15,8 @@ from nameko.exceptions import RemoteError, RpcTimeout
 from nameko.extensions import DependencyProvider
 from nameko.rpc import MethodProxy, Responder, get_rpc_exchange, rpc
 from nameko.standalone.rpc import (
-    ClusterRpcProxy, ConsumeEvent, ServiceRpcProxy
+    ClusterProxy, ClusterRpcProxy, ConsumeEvent, PollingQueueConsumer,
+    ServiceRpcProxy
 )
 from nameko.testing.waiting import wait_for_call
 
@@ -436,6 +437,14 @@ class TestConsumeEvent(object):
         assert "disconnected" in str(raised.value)
         assert not queue_consumer.get_message.called
 
+    def test_slotted(self, queue_consumer):
+        event = ConsumeEvent(queue_consumer, 1)
+        assert event.body is None
+        assert event.exception is None
+
+        with pytest.raises(AttributeError):
+            event.__dict__
+
 
 def test_timeout_not_needed(container_factory, rabbit_manager, rabbit_config):
     container = container_factory(FooService, rabbit_config)
@@ -485,6 +494,74 @@ def test_async_timeout(
         result.result()
 
 
+def test_timeout_is_a_deadline():
+    queue_consumer = PollingQueueConsumer(timeout=1)
+    queue_consumer.provider = Mock(_reply_events={})
+    queue_consumer.consumer = Mock()
+
+    event = Mock()
+    queue_consumer.provider._reply_events["awaited"] = event
+
+    clock = [0]
+
+    def drain_events(timeout):
+        # each drain delivers a reply for some other call
+        assert 0 < timeout <= 1
+        clock[0] += 0.6
+        queue_consumer.replies["other"] = ("body", Mock())
+
+    queue_consumer.consumer.connection.drain_events.side_effect = drain_events
+
+    with patch.object(queue_consumer, '_setup_consumer') as setup_consumer:
+        with patch('nameko.standalone.rpc.time') as time:
+            time.monotonic.side_effect = lambda: clock[0]
+            queue_consumer.get_message("awaited")
+
+    # other replies did not restart the timeout
+    assert queue_consumer.consumer.connection.drain_events.call_count == 2
+    (exc,), _ = event.send_exception.call_args
+    assert isinstance(exc, RpcTimeout)
+    assert "awaited" not in queue_consumer.provider._reply_events
+    # the connection did not time out, so the consumer is left intact
+    assert not setup_consumer.called
+
+
+def test_reconnects_are_bounded():
+    queue_consumer = PollingQueueConsumer()
+    queue_consumer.provider = Mock(_reply_events={})
+    queue_consumer.consumer = Mock()
+
+    drain_events = queue_consumer.consumer.connection.drain_events
+    drain_events.side_effect = IOError("boom")
+
+    with patch.object(queue_consumer, '_setup_consumer') as setup_consumer:
+        with pytest.raises(IOError):
+            queue_consumer.get_message("awaited")
+
+    max_reconnects = PollingQueueConsumer.max_reconnects
+    assert setup_consumer.call_count == max_reconnects
+    assert drain_events.call_count == max_reconnects + 1
+
+    # a successful reconnect carries on waiting for the reply
+    body, message = "body", Mock()
+
+    def fail_once(timeout):
+        if drain_events.call_count == 1:
+            raise IOError("boom")
+        queue_consumer.replies["awaited"] = (body, message)
+
+    drain_events.reset_mock()
+    drain_events.side_effect = fail_once
+
+    with patch.object(queue_consumer, '_setup_consumer') as setup_consumer:
+        queue_consumer.get_message("awaited")
+
+    assert setup_consumer.call_count == 1
+    assert queue_consumer.provider.handle_message.call_args == call(
+        body, message
+    )
+
+
 def test_use_after_close(container_factory, rabbit_manager, rabbit_config):
     container = container_factory(FooService, rabbit_config)
     container.start()
@@ -538,6 +615,28 @@ def test_cluster_proxy_dict_access(
         assert proxy['foobar'].spam(ham=3) == 3
 
 
+def test_cluster_proxy_reuses_service_proxies():
+    proxy = ClusterProxy(Mock(), Mock())
+
+    assert proxy.foobar is proxy['foobar']
+    assert proxy.other is not proxy.foobar
+    # dict-like access resolves service names, not the proxy's own attributes
+    assert proxy['_proxies'] is not proxy._proxies
+
+
+def test_cluster_proxy_accepts_attributes():
+    worker_ctx = Mock()
+    worker_ctx.container.config = {'AMQP_URI': 'memory://'}
+    proxy = ClusterProxy(worker_ctx, Mock())
+
+    proxy.foo = 1
+    assert proxy.foo == 1
+
+    with patch.object(proxy, 'service') as service:
+        assert proxy.service is service
+    assert proxy.service is not service
+
+
 def test_recover_from_keyboardinterrupt(
     container_factory, rabbit_manager, rabbit_config
 ):
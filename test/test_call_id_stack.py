@@ -1,8 +1,11 @@
+import uuid
+import weakref
+
 import pytest
 from mock import Mock, call
 
 from nameko.constants import PARENT_CALLS_CONFIG_KEY
-from nameko.containers import WorkerContext
+from nameko.containers import WorkerContext, new_call_id
 from nameko.events import EventDispatcher, event_handler
 from nameko.extensions import DependencyProvider
 from nameko.rpc import RpcProxy, rpc
@@ -41,6 +44,45 @@ def test_worker_context_gets_stack(container_factory):
     assert context.call_id_stack == expected
 
 
+def test_stack_length_precomputed_by_container(container_factory):
+
+    class FooService(object):
+        name = 'baz'
+
+    container = container_factory(FooService, {PARENT_CALLS_CONFIG_KEY: 1})
+    assert container.call_id_stack_maxlen == 2
+
+    many_ids = [str(i) for i in range(100)]
+    context = WorkerContext(
+        container, FooService(), DummyProvider("long"),
+        data={'call_id_stack': many_ids}
+    )
+    assert len(context.call_id_stack) == 2
+
+
+def test_stack_length_from_minimal_container():
+    container = Mock(spec=['config', 'service_name'])
+    container.config = {PARENT_CALLS_CONFIG_KEY: 0}
+
+    context = WorkerContext(container, None, DummyProvider("long"))
+    assert context.call_id_stack == [context.call_id]
+
+
+def test_worker_context_accepts_attributes(container_factory):
+
+    class FooService(object):
+        name = 'baz'
+
+    container = container_factory(FooService, {})
+    context = WorkerContext(container, FooService(), DummyProvider("bar"))
+
+    # extensions and tests may set ad-hoc attributes on the context
+    context.extra = "value"
+    assert context.extra == "value"
+    # and track per-worker state in weak-keyed dicts
+    assert weakref.ref(context)() is context
+
+
 @pytest.mark.usefixtures("predictable_call_ids")
 def test_short_call_stack(container_factory):
 
@@ -282,3 +324,12 @@ class TestOriginCallId(object):
         )
 
         assert worker_ctx.origin_call_id is None
+
+
+def test_new_call_id_is_uuid4():
+    call_id = new_call_id()
+    parsed = uuid.UUID(call_id)
+    assert str(parsed) == call_id
+    assert parsed.version == 4
+    assert parsed.variant == uuid.RFC_4122
+    assert new_call_id() != call_id
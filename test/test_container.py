@@ -1,5 +1,6 @@
 # coding: utf-8
 
+import logging
 import sys
 from functools import partial
 
@@ -236,6 +237,80 @@ def test_container_doesnt_exhaust_max_workers(container):
         assert gt.dead
 
 
+def test_service_instantiated_when_worker_runs():
+    instances = []
+    spam_continue = Event()
+
+    class Service(object):
+        name = 'max-workers'
+
+        def __init__(self):
+            instances.append(self)
+
+        @foobar
+        def spam(self):
+            spam_continue.wait()
+
+    container = ServiceContainer(Service, config={MAX_WORKERS_CONFIG_KEY: 1})
+    dep = get_extension(container, Entrypoint)
+
+    first_ctx = container.spawn_worker(dep, [], {})
+    assert first_ctx.service is None  # not running yet
+
+    # the second worker blocks waiting for a free slot in the pool
+    gt = spawn(container.spawn_worker, dep, [], {})
+    sleep()
+    assert instances == [first_ctx.service]
+
+    with Timeout(1):
+        spam_continue.send(None)
+        second_ctx = gt.wait()
+        container._worker_pool.waitall()
+
+    assert instances == [first_ctx.service, second_ctx.service]
+
+
+def test_service_instantiation_error_reaches_handle_result():
+
+    class Service(object):
+        name = 'broken'
+
+        dep = CallCollectingDependencyProvider()
+
+        def __init__(self):
+            raise ValueError('boom')
+
+        @foobar
+        def spam(self):
+            pass  # pragma: no cover
+
+    container = ServiceContainer(Service, config={})
+    container.start()
+    entrypoint = get_extension(container, Entrypoint)
+
+    results = []
+
+    def handle_result(worker_ctx, result, exc_info):
+        results.append((result, exc_info))
+        return result, exc_info
+
+    with Timeout(1):
+        container.spawn_worker(
+            entrypoint, [], {}, handle_result=handle_result
+        )
+        container._worker_pool.waitall()
+
+    [(result, exc_info)] = results
+    assert result is None
+    assert exc_info[0] is ValueError
+
+    # the container survives, and no worker lifecycle hooks ran
+    assert not container._died.ready()
+    dep = get_extension(container, CallCollectingDependencyProvider)
+    assert dep.calls == ['setup', 'start']
+    container.stop()
+
+
 def test_stop_already_stopped(container, logger):
 
     assert not container._died.ready()
@@ -335,6 +410,51 @@ def test_spawned_thread_kills_container(container):
     assert exc_info.value.args == ('foobar',)
 
 
+def test_spawned_thread_n_kills_container(container):
+    def raise_error():
+        raise Exception('foobar')
+
+    container.start()
+    container.spawn_managed_thread_n(raise_error)
+
+    with pytest.raises(Exception) as exc_info:
+        container.wait()
+
+    assert exc_info.value.args == ('foobar',)
+    assert not container._managed_threads
+
+
+def test_spawned_thread_n_untracked_on_exit(container):
+    finished = Event()
+
+    container.spawn_managed_thread_n(lambda: finished.send(True))
+    assert len(container._managed_threads) == 1
+
+    with Timeout(1):
+        finished.wait()
+        sleep()
+    assert not container._managed_threads
+
+
+def test_stop_kills_remaining_spawned_threads_n(container):
+    running = Event()
+
+    def sleep_forever():
+        running.send(True)
+        while True:
+            sleep()
+
+    container.start()
+    container.spawn_managed_thread_n(sleep_forever)
+    running.wait()
+    container.spawn_managed_thread_n(sleep_forever)  # never started
+
+    with Timeout(1):
+        container.stop()
+
+    assert not container._managed_threads
+
+
 def test_spawned_thread_causes_container_to_kill_other_thread(container):
     killed_by_error_raised = Event()
 
@@ -556,3 +676,93 @@ def test_logging_managed_threads(container, logger):
     assert call("killing managed thread `%s`", "wait") in call_args_list
     assert call("killing managed thread `%s`", "<unknown>") in call_args_list
     assert call("killing managed thread `%s`", "named") in call_args_list
+
+
+def test_patched_dependency_collected():
+
+    class PatchedService(object):
+        name = 'patched-service'
+
+        spam = CallCollectingDependencyProvider()
+
+    class OtherDependency(CallCollectingDependencyProvider):
+        pass
+
+    ServiceContainer(PatchedService, config={})
+
+    with patch.object(PatchedService, 'spam', OtherDependency()):
+        container = ServiceContainer(PatchedService, config={})
+
+    # each container introspects the class as it is when constructed
+    [dependency] = container.dependencies
+    assert isinstance(dependency, OtherDependency)
+
+
+def test_wrapped_entrypoints_collected():
+
+    class WrappedService(object):
+        name = 'wrapped-service'
+
+        @staticmethod
+        @foobar
+        def ham():
+            pass  # pragma: no cover
+
+        @classmethod
+        @foobar
+        def egg(cls):
+            pass  # pragma: no cover
+
+    container = ServiceContainer(WrappedService, config={})
+    assert sorted(
+        ext.method_name for ext in container.entrypoints
+    ) == ['egg', 'ham']
+
+
+def test_inherited_members_collected():
+
+    class Base(object):
+        name = 'base-service'
+
+        spam = CallCollectingDependencyProvider()
+
+        @foobar
+        def ham(self):
+            pass  # pragma: no cover
+
+        @foobar
+        def egg(self):
+            pass  # pragma: no cover
+
+    class Derived(Base):
+        spam = None  # shadows the base dependency provider
+
+        def egg(self):  # shadows the base entrypoint
+            pass  # pragma: no cover
+
+    container = ServiceContainer(Derived, config={})
+    assert not container.dependencies
+    assert [ext.method_name for ext in container.entrypoints] == ['ham']
+
+
+@pytest.mark.parametrize("level, generated", [
+    (logging.INFO, False),
+    (logging.DEBUG, True),
+])
+def test_call_id_stack_only_logged_when_debug_enabled(
+    container, level, generated
+):
+    ham_dep = get_extension(container, Entrypoint, method_name="ham")
+
+    logger = logging.getLogger('nameko.containers')
+    original_level = logger.level
+    logger.setLevel(level)
+    try:
+        with patch('nameko.containers.new_call_id') as new_call_id:
+            new_call_id.return_value = "0"
+            container.spawn_worker(ham_dep, [], {})
+            container._worker_pool.waitall()
+    finally:
+        logger.setLevel(original_level)
+
+    assert new_call_id.called is generated
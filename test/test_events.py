@@ -61,6 +61,23 @@ def test_auto_delete(config, expected_auto_delete):
     assert exchange.auto_delete is expected_auto_delete
 
 
+def test_event_exchange_shared():
+    exchange = get_event_exchange("example", {})
+    assert get_event_exchange("example", {}) is exchange
+
+    assert get_event_exchange("other", {}) is not exchange
+    assert get_event_exchange(
+        "example", {'AUTO_DELETE_EVENT_EXCHANGES': True}
+    ) is not exchange
+
+
+def test_event_exchange_unhashable_config():
+    exchange = get_event_exchange(
+        "example", {'AUTO_DELETE_EVENT_EXCHANGES': []}
+    )
+    assert exchange.name == "example.events"
+
+
 def test_event_dispatcher(mock_container, mock_producer, rabbit_config):
     container = mock_container
     container.config = rabbit_config
@@ -1,6 +1,9 @@
 # coding: utf-8
 
+import gc
 import json
+import sys
+import weakref
 
 import pytest
 import six
@@ -8,7 +11,7 @@ from mock import patch
 
 from nameko.exceptions import (
     RemoteError, UnserializableValueError, deserialize,
-    deserialize_to_instance, safe_for_serialization, serialize
+    deserialize_to_instance, get_module_path, safe_for_serialization, serialize
 )
 
 
@@ -112,6 +115,41 @@ def test_exception_name_clash():
     assert str(deserialized) == "missing"
 
 
+@pytest.mark.usefixtures('registry')
+def test_serialize_unregistered_subclass_of_registered_exception():
+    deserialize_to_instance(CustomError)
+
+    class SubError(CustomError):
+        pass
+
+    # priming the parent's path at registration must not leak to subclasses
+    data = serialize(SubError('something went wrong'))
+    assert data['exc_type'] == 'SubError'
+    assert data['exc_path'] == 'test.test_exceptions.SubError'
+
+    # so the subclass arrives as a RemoteError, not as its registered parent
+    deserialized = deserialize(data)
+    assert type(deserialized) == RemoteError
+    assert deserialized.exc_type == 'SubError'
+
+
+def test_get_module_path():
+    assert get_module_path(CustomError) == "test.test_exceptions.CustomError"
+    # cached
+    assert get_module_path(CustomError) == "test.test_exceptions.CustomError"
+
+    class NotImported(Exception):
+        __module__ = "not.an.imported.module"
+
+    assert get_module_path(NotImported) == "not.an.imported.module.NotImported"
+
+    # the cache does not keep dynamically created types alive
+    ref = weakref.ref(NotImported)
+    del NotImported
+    gc.collect()
+    assert ref() is None
+
+
 def test_serialize_backwards_compat():
 
     exc = CustomError('something went wrong')
@@ -168,11 +206,37 @@ def test_unserializable_value_error():
     ({None: object}, {'None': OBJECT_REPR}),
     ((1, 2), ['1', '2']),
     ([1, [2]], ['1', ['2']]),
+    ({'a': [{'b': (1, None)}], 'c': True}, {'a': [{'b': ['1', 'None']}], 'c': 'True'}),
+    (iter([1.5, 'x']), ['1.5', 'x']),
 ])
 def test_safe_for_serialization(value, safe_value):
     assert safe_for_serialization(value) == safe_value
 
 
+def test_safe_for_serialization_deeply_nested():
+    value = []
+    for _ in range(sys.getrecursionlimit() * 2):
+        value = [value]
+
+    safe = safe_for_serialization(value)
+    depth = 0
+    while safe:
+        (safe,) = safe
+        depth += 1
+    assert depth == sys.getrecursionlimit() * 2
+
+
+def test_safe_for_serialization_cyclic():
+    value = [1]
+    value.append({'self': value})
+
+    with pytest.raises(ValueError):
+        safe_for_serialization(value)
+
+    shared = [1]
+    assert safe_for_serialization([shared, shared]) == [['1'], ['1']]
+
+
 def test_safe_for_serialization_bad_str():
     class BadStr(object):
         def __str__(self):
@@ -1,11 +1,15 @@
 # coding: utf-8
 
+import inspect
+from functools import wraps
+
 import pytest
-from mock import Mock
+from mock import Mock, patch
 
+from nameko.exceptions import IncorrectSignature
 from nameko.extensions import (
-    DependencyProvider, Entrypoint, Extension, is_dependency, is_entrypoint,
-    is_extension
+    DependencyProvider, Entrypoint, Extension, get_sub_extensions,
+    is_dependency, is_entrypoint, is_extension, iter_extensions
 )
 from nameko.testing.services import entrypoint_hook
 from nameko.testing.utils import get_extension
@@ -141,6 +145,71 @@ def test_extension_defined_on_instance(container_factory):
     assert dyn_dep.ext.arg == "argument_for_extension"
 
 
+def test_get_sub_extensions():
+
+    class Base(Extension):
+        inherited = SimpleExtension()
+        shadowed = SimpleExtension()
+
+    class Composite(Base):
+        shadowed = None  # hides the base class extension
+        declared = SimpleExtension()
+
+        def __init__(self):
+            self.dynamic = SimpleExtension()
+
+        @property
+        def computed(self):
+            return self.declared
+
+        @property
+        def missing(self):
+            raise AttributeError("missing")
+
+        def method(self):
+            pass  # pragma: no cover
+
+    ext = Composite()
+
+    members = get_sub_extensions(ext)
+    assert members == inspect.getmembers(ext, is_extension)
+    assert [name for name, _ in members] == [
+        'computed', 'declared', 'dynamic', 'inherited'
+    ]
+
+
+def test_get_sub_extensions_evaluates_descriptors():
+
+    class Raising(Extension):
+        @property
+        def value(self):
+            raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        get_sub_extensions(Raising())
+
+
+def test_iter_extensions_depth_first():
+
+    class Leaf(Extension):
+        pass
+
+    class Middle(Extension):
+        a = Leaf()
+        b = Leaf()
+
+    class Root(Extension):
+        first = Middle()
+        second = Leaf()
+
+    root = Root()
+
+    assert list(iter_extensions(root)) == [
+        Middle.a, Middle.b, Root.first, Root.second
+    ]
+    assert list(iter_extensions(Leaf())) == []
+
+
 def test_is_extension():
     ext = SimpleExtension()
     assert is_extension(ext)
@@ -230,6 +299,75 @@ def test_extension_str():
     assert str(bound).startswith("<Extension at")
 
 
+def test_check_signature(container_factory):
+
+    def passthrough(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            return fn(*args, **kwargs)  # pragma: no cover
+        return wrapper
+
+    class Service(object):
+        name = "service"
+
+        @simple
+        def meth(self, a, b=None):
+            pass  # pragma: no cover
+
+        @simple
+        @passthrough
+        def decorated(self, a):
+            pass  # pragma: no cover
+
+    container = container_factory(Service, {})
+    entrypoint = get_extension(container, SimpleEntrypoint, method_name="meth")
+
+    entrypoint.check_signature(("a",), {})
+    entrypoint.check_signature((), {"a": "a", "b": "b"})
+    with pytest.raises(IncorrectSignature):
+        entrypoint.check_signature((), {})
+    with pytest.raises(IncorrectSignature):
+        entrypoint.check_signature(("a", "b", "c"), {})
+
+    # replacing the method is picked up by the next check
+    with patch.object(Service, "meth", lambda self: None):
+        entrypoint.check_signature((), {})
+    with pytest.raises(IncorrectSignature):
+        entrypoint.check_signature((), {})
+
+    # the wrapper's signature is checked, as `inspect.getcallargs` does
+    decorated = get_extension(
+        container, SimpleEntrypoint, method_name="decorated"
+    )
+    decorated.check_signature((), {"anything": "goes"})
+
+
+@pytest.mark.parametrize("args, kwargs", [
+    ((), {}),
+    (("a", "b", "c"), {}),
+    (("a",), {"a": "a"}),
+    (("a",), {"unknown": "c"}),
+])
+def test_check_signature_message(container_factory, args, kwargs):
+
+    class Service(object):
+        name = "service"
+
+        @simple
+        def meth(self, a, b=None):
+            pass  # pragma: no cover
+
+    container = container_factory(Service, {})
+    entrypoint = get_extension(container, SimpleEntrypoint, method_name="meth")
+
+    # callers see the same text `inspect.getcallargs` has always produced
+    with pytest.raises(TypeError) as expected:
+        inspect.getcallargs(Service.meth, None, *args, **kwargs)
+    with pytest.raises(IncorrectSignature) as exc_info:
+        entrypoint.check_signature(args, kwargs)
+    assert str(exc_info.value) == str(expected.value)
+
+
 def test_entrypoint_str():
     container = Mock()
     container.service_name = "sérvice"
@@ -55,3 +55,16 @@ def test_timing_logger_precision(mock_logging):
     assert logger.log.call_args_list == [
         call(logging.DEBUG, "msg %s in %0.5fs", "foo", ANY)
     ]
+
+
+def test_timing_logger_disabled_level(mock_time):
+
+    logger = Mock()
+    logger.isEnabledFor.return_value = False
+    log_time = make_timing_logger(logger)
+
+    with log_time("msg %s", "foo"):
+        pass
+
+    logger.isEnabledFor.assert_called_once_with(logging.DEBUG)
+    assert not logger.log.called
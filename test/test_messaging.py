@@ -1,6 +1,7 @@
 from __future__ import absolute_import
 
 import ssl
+import warnings
 from contextlib import contextmanager
 
 import eventlet
@@ -104,6 +105,46 @@ def test_consume_provider(mock_container):
     queue_consumer.requeue_message.assert_called_once_with(message)
 
 
+def test_publisher_declares_on_single_channel(
+    patch_maybe_declare, mock_container
+):
+    container = mock_container
+    container.config = {'AMQP_URI': 'memory://'}
+    container.service_name = "srcservice"
+
+    publisher = Publisher(
+        exchange=foobar_ex, declare=[foobar_queue]
+    ).bind(container, "publish")
+
+    with patch('nameko.messaging.get_connection') as get_connection:
+        connection = get_connection.return_value.__enter__.return_value
+        publisher.setup()
+
+    assert connection.channel.call_count == 1
+    channel = connection.channel.return_value
+    assert patch_maybe_declare.call_args_list == [
+        call(foobar_queue, channel),
+        call(foobar_ex, channel),
+    ]
+    assert channel.close.call_count == 1
+
+
+def test_publisher_without_declarations_opens_no_channel(
+    patch_maybe_declare, mock_container
+):
+    container = mock_container
+    container.config = {'AMQP_URI': 'memory://'}
+    container.service_name = "srcservice"
+
+    publisher = Publisher().bind(container, "publish")
+
+    with patch('nameko.messaging.get_connection') as get_connection:
+        publisher.setup()
+
+    assert not get_connection.called
+    assert not patch_maybe_declare.called
+
+
 @pytest.mark.usefixtures("predictable_call_ids")
 def test_publish_to_exchange(
     patch_maybe_declare, mock_channel, mock_producer, mock_container
@@ -275,6 +316,22 @@ def test_header_encoder(empty_config):
         }
 
 
+def test_header_encoder_warns_once_for_none_values():
+
+    context_data = {'foo': 'FOO', 'bar': None, 'baz': None}
+
+    encoder = HeaderEncoder()
+    worker_ctx = Mock(context_data=context_data)
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        res = encoder.get_message_headers(worker_ctx)
+
+    assert res == {'{}.foo'.format(encoder.header_prefix): 'FOO'}
+    assert len(caught) == 1
+    assert caught[0].category is UserWarning
+
+
 def test_header_decoder():
 
     headers = {
@@ -1044,6 +1101,26 @@ class TestBackwardsCompatClassAttrs(object):
         publisher.setup()
         assert getattr(publisher.publisher, parameter) == value
 
+    @pytest.mark.parametrize("parameter,value", [
+        ('retry', False),
+        ('retry_policy', {'max_retries': 999}),
+        ('use_confirms', False),
+    ])
+    def test_attrs_added_after_definition(
+        self, parameter, value, mock_container
+    ):
+        """ Verify that attributes patched onto the class after it was
+        defined are also applied.
+        """
+        publisher_cls = type("LegacPublisher", (Publisher,), {})
+        with patch.object(publisher_cls, parameter, value, create=True):
+            mock_container.config = {'AMQP_URI': 'memory://'}
+            mock_container.service_name = "service"
+            publisher = publisher_cls().bind(mock_container, "publish")
+
+        publisher.setup()
+        assert getattr(publisher.publisher, parameter) == value
+
 
 class TestConfigurability(object):
     """
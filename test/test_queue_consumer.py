@@ -54,6 +54,73 @@ def spawn_managed_thread(method, identifier=None):
     return eventlet.spawn(method)
 
 
+def test_handle_message_identifier(mock_container):
+
+    mock_container.shared_extensions = {}
+    queue_consumer = QueueConsumer().bind(mock_container)
+
+    handler = MessageHandler()
+    spawn = mock_container.spawn_managed_thread
+
+    for routing_key in ('ham', 'eggs'):
+        message = Mock(delivery_info={'routing_key': routing_key})
+        queue_consumer.handle_message(handler, 'body', message)
+
+        (fn,), kwargs = spawn.call_args
+        assert kwargs == {
+            'identifier': 'MessageHandler.handle_message[{}]'.format(
+                routing_key
+            )
+        }
+        fn()
+        assert handler.wait() is message
+        handler.handle_message_called.reset()
+
+    assert queue_consumer._ident_prefixes == {
+        handler: 'MessageHandler.handle_message['
+    }
+
+
+def test_connection_params_read_once(mock_container):
+
+    mock_container.shared_extensions = {}
+    mock_container.config = {
+        AMQP_URI_CONFIG_KEY: 'memory://',
+        HEARTBEAT_CONFIG_KEY: 5,
+    }
+    queue_consumer = QueueConsumer().bind(mock_container)
+
+    conn = queue_consumer.connection
+    assert conn.heartbeat == 5
+
+    # each (re)connect builds a new connection from the cached parameters
+    mock_container.config = {AMQP_URI_CONFIG_KEY: 'memory://'}
+    reconnected = queue_consumer.connection
+    assert reconnected is not conn
+    assert reconnected.heartbeat == 5
+
+
+@pytest.mark.parametrize("method", ["ack", "requeue"])
+def test_ack_and_requeue_skip_closed_channels(method, mock_container):
+
+    mock_container.shared_extensions = {}
+    queue_consumer = QueueConsumer().bind(mock_container)
+    settle = getattr(queue_consumer, "{}_message".format(method))
+
+    live = Mock()
+    settle(live)
+    assert getattr(live, method).call_count == 1
+
+    closed = Mock()
+    closed.channel.connection = None
+    settle(closed)
+    assert not getattr(closed, method).called
+
+    unbound = Mock(channel=None)
+    settle(unbound)
+    assert not getattr(unbound, method).called
+
+
 def test_lifecycle(rabbit_manager, rabbit_config, mock_container):
 
     container = mock_container
@@ -25,7 +25,8 @@ from nameko.exceptions import (
 from nameko.extensions import DependencyProvider
 from nameko.messaging import QueueConsumer
 from nameko.rpc import (
-    MethodProxy, ReplyListener, Responder, Rpc, RpcConsumer, RpcProxy, rpc
+    MethodProxy, ReplyListener, Responder, Rpc, RpcConsumer, RpcProxy,
+    RpcReply, ServiceProxy, rpc
 )
 from nameko.standalone.rpc import ServiceRpcProxy
 from nameko.testing.services import (
@@ -114,6 +115,18 @@ def queue_consumer():
         yield replacement
 
 
+def test_rpc_exchange_shared():
+    from nameko.rpc import get_rpc_exchange
+
+    exchange = get_rpc_exchange({})
+    assert exchange.name == "nameko-rpc"
+    assert get_rpc_exchange({}) is exchange
+
+    custom = get_rpc_exchange({'rpc_exchange': 'custom'})
+    assert custom.name == "custom"
+    assert custom is not exchange
+
+
 def test_rpc_consumer(get_rpc_exchange, queue_consumer, mock_container):
 
     container = mock_container
@@ -155,6 +168,70 @@ def test_rpc_consumer(get_rpc_exchange, queue_consumer, mock_container):
     consumer.unregister_provider(entrypoint)
     assert consumer._providers == set()
 
+    routing_key = "exampleservice.rpcmethod"
+    with pytest.raises(MethodNotFound):
+        consumer.get_provider_for_method(routing_key)
+
+
+def test_rpc_consumer_reads_responder_options_once(
+    queue_consumer, mock_container
+):
+    container = mock_container
+    container.shared_extensions = {}
+    container.config = {'AMQP_URI': 'memory://', 'serializer': 'pickle'}
+    container.service_name = "exampleservice"
+
+    consumer = RpcConsumer().bind(container)
+
+    with patch('nameko.rpc.Responder') as responder_cls:
+        responder_cls.return_value.send_response.return_value = (None, None)
+
+        consumer.handle_result(Mock(), None, None)
+        container.config = {'AMQP_URI': 'memory://changed'}
+        consumer.handle_result(Mock(), None, None)
+
+    first, second = responder_cls.call_args_list
+    assert first[0][0] == second[0][0] == 'memory://'
+    assert first[0][2] == second[0][2] == 'pickle'
+    assert first[0][1] is second[0][1]
+
+
+def test_per_call_objects_are_slotted():
+    reply = RpcReply(Event())
+    assert reply.resp_body is None
+
+    responder = Responder('memory://', Mock(), 'json', Mock())
+
+    for obj in (reply, responder):
+        with pytest.raises(AttributeError):
+            object.__getattribute__(obj, '__dict__')
+
+
+def test_service_proxy_accepts_attributes():
+    worker_ctx = Mock()
+    worker_ctx.container.config = {'AMQP_URI': 'memory://'}
+    proxy = ServiceProxy(worker_ctx, "service", Mock())
+
+    # services' tests commonly stub out individual remote methods
+    proxy.foo = 1
+    assert proxy.foo == 1
+
+    with patch.object(proxy, 'method') as method:
+        assert proxy.method is method
+    assert proxy.method is not method
+
+
+def test_service_proxy_reuses_method_proxies():
+    proxy = ServiceProxy(Mock(), "service", Mock())
+
+    with patch('nameko.rpc.MethodProxy') as method_proxy_cls:
+        method_proxy_cls.side_effect = lambda *args, **kwargs: Mock()
+
+        assert proxy.method is proxy.method
+        assert proxy.other is not proxy.method
+
+    assert method_proxy_cls.call_count == 2
+
 
 def test_rpc_consumer_unregisters_if_no_providers(
     container_factory, rabbit_config
@@ -1539,6 +1616,28 @@ class TestBackwardsCompatClassAttrs(object):
 
         assert getattr(proxy.publisher, parameter) == value
 
+    @pytest.mark.parametrize("parameter,value", [
+        ('retry', False),
+        ('retry_policy', {'max_retries': 999}),
+        ('use_confirms', False),
+    ])
+    def test_attrs_added_after_definition(
+        self, parameter, value, mock_container
+    ):
+        """ Verify that attributes patched onto the class after it was
+        defined are also applied.
+        """
+        method_proxy_cls = type("LegacyMethodProxy", (MethodProxy,), {})
+        with patch.object(method_proxy_cls, parameter, value, create=True):
+            worker_ctx = Mock()
+            worker_ctx.container.config = {'AMQP_URI': 'memory://'}
+            reply_listener = Mock()
+            proxy = method_proxy_cls(
+                worker_ctx, "service", "method", reply_listener
+            )
+
+        assert getattr(proxy.publisher, parameter) == value
+
 
 class TestConfigurability(object):
     """
@@ -1,5 +1,6 @@
+import kombu.serialization
 import pytest
-from mock import ANY, Mock
+from mock import ANY, Mock, patch
 
 from nameko.rpc import Responder
 
@@ -41,6 +42,26 @@ def test_responder(message, mock_producer):
     assert msg == expected_msg
 
 
+@pytest.mark.parametrize("worker_result,checks", [(None, 0), (True, 1)])
+def test_responder_serialization_check(
+    message, mock_producer, worker_result, checks
+):
+
+    exchange = Mock()
+
+    responder = Responder('amqp://localhost', exchange, 'json', message)
+
+    with patch(
+        'kombu.serialization.dumps', wraps=kombu.serialization.dumps
+    ) as dumps:
+        result, exc_info = responder.send_response(worker_result, None)
+
+    assert result is worker_result
+    assert exc_info is None
+    # `None` needs no up-front check; anything else is trial-encoded once
+    assert dumps.call_count == checks
+
+
 def test_responder_worker_exc(message, mock_producer):
 
     exchange = Mock()
@@ -1,3 +1,4 @@
+import copy
 import json
 import uuid
 
@@ -6,6 +7,7 @@ import yaml
 from kombu import Exchange, Queue
 from mock import Mock, call
 
+from nameko import serialization
 from nameko.constants import (
     ACCEPT_CONFIG_KEY, SERIALIZER_CONFIG_KEY, SERIALIZERS_CONFIG_KEY
 )
@@ -221,6 +223,27 @@ def test_custom_serializer(container_factory, rabbit_config,
     assert msg['properties']['content_type'] == "application/x-upper-json"
 
 
+def test_setup_leaves_serializers_config_intact():
+
+    serializers = {
+        'upperjson': {
+            'encoder': 'test.test_serialization.upperjson_encode',
+            'decoder': 'test.test_serialization.upperjson_decode',
+            'content_type': 'application/x-upper-json'
+        }
+    }
+    config = {
+        SERIALIZER_CONFIG_KEY: 'upperjson',
+        SERIALIZERS_CONFIG_KEY: serializers,
+    }
+    expected = copy.deepcopy(config)
+
+    # every container runs setup against the same config
+    for _ in range(2):
+        assert serialization.setup(config) == ('upperjson', ['upperjson'])
+        assert config == expected
+
+
 @pytest.mark.parametrize(
     'config',
     (
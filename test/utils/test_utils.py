@@ -3,16 +3,18 @@
 import pytest
 from eventlet import GreenPool, sleep
 from eventlet.event import Event
+from mock import patch
 
 import nameko.rpc
+import nameko.utils
 from nameko.containers import ServiceContainer
-from nameko.extensions import DependencyProvider
+from nameko.extensions import DependencyProvider, Entrypoint
 from nameko.rpc import Rpc, rpc
 from nameko.testing.services import dummy, entrypoint_hook, get_extension
 from nameko.utils import (
     REDACTED, get_redacted_args, import_from_path, sanitize_url
 )
-from nameko.utils.concurrency import fail_fast_imap
+from nameko.utils.concurrency import SpawningSet, fail_fast_imap
 
 
 def test_fail_fast_imap():
@@ -46,6 +48,73 @@ def test_fail_fast_imap():
     assert pool.free() == 2
 
 
+def test_fail_fast_imap_yields_every_result():
+    pool = GreenPool(3)
+
+    # a generator has no length
+    items = (value for value in (1, 2, 3))
+    results = fail_fast_imap(pool, lambda value: value * 10, items)
+
+    # every thread has finished by the time the first result is yielded,
+    # but the remaining results are still delivered
+    first = next(results)
+    assert sorted([first] + list(results)) == [10, 20, 30]
+
+
+def test_spawning_proxy_reuses_pool():
+
+    class Item(object):
+        def __init__(self):
+            self.calls = []
+            self.pools = []
+
+        def setup(self):
+            self.calls.append('setup')
+            self.pools.append(proxy._pool.running())
+
+        def start(self):
+            self.calls.append('start')
+            self.pools.append(proxy._pool.running())
+
+    items = SpawningSet([Item(), Item()])
+    proxy = items.all
+    assert items.all is proxy
+    assert proxy.setup is proxy.setup
+
+    with patch('nameko.utils.concurrency.eventlet.GreenPool',
+               wraps=GreenPool) as pool_cls:
+        proxy.setup()
+        proxy.start()
+        assert pool_cls.call_count == 1
+
+        # growing the item set needs a bigger pool
+        items.add(Item())
+        proxy.setup()
+        assert pool_cls.call_count == 2
+
+    assert sorted(len(item.calls) for item in items) == [1, 3, 3]
+    # every call ran on the proxy's own pool
+    assert all(running > 0 for item in items for running in item.pools)
+
+
+def test_spawning_set_all_reuses_pool():
+
+    class Item(object):
+        def stop(self):
+            pass
+
+        def kill(self):
+            pass
+
+    items = SpawningSet([Item(), Item()])
+
+    with patch('nameko.utils.concurrency.eventlet.GreenPool',
+               wraps=GreenPool) as pool_cls:
+        items.all.stop()
+        items.all.kill()
+        assert pool_cls.call_count == 1
+
+
 class TestGetRedactedArgs(object):
 
     @pytest.mark.parametrize("sensitive_arguments, expected", [
@@ -221,6 +290,70 @@ class TestGetRedactedArgs(object):
             }
         }
 
+    def test_get_redacted_args_result_is_independent(
+        self, container_factory
+    ):
+
+        class Service(object):
+            name = "service"
+
+            @dummy(sensitive_arguments=('a', 'b.foo[0]'))
+            def method(self, a, b, c, d=None, *args, **kwargs):
+                pass  # pragma: no cover
+
+        container = container_factory(Service, {})
+        entrypoint = get_extension(container, Entrypoint)
+
+        complex_arg = {'foo': [1, 2, 3], 'baz': {'qux': "QUX"}}
+        other_arg = {'bar': "BAR"}
+
+        redacted = get_redacted_args(
+            entrypoint, "A", complex_arg, other_arg, extra="E"
+        )
+        assert redacted == {
+            'a': REDACTED,
+            'b': {'foo': [REDACTED, 2, 3], 'baz': {'qux': "QUX"}},
+            'c': {'bar': "BAR"},
+            'd': None,
+            'args': (),
+            'kwargs': {'extra': "E"},
+        }
+        # the caller's arguments are untouched and never shared with the result
+        assert complex_arg == {'foo': [1, 2, 3], 'baz': {'qux': "QUX"}}
+        assert redacted['b']['baz'] is not complex_arg['baz']
+        assert redacted['c'] is not other_arg
+
+    def test_get_redacted_args_parses_once_per_entrypoint(
+        self, container_factory
+    ):
+
+        class Service(object):
+            name = "service"
+
+            @dummy(sensitive_arguments="a")
+            def method(self, a, b):
+                pass  # pragma: no cover
+
+        container = container_factory(Service, {})
+        entrypoint = get_extension(container, Entrypoint)
+
+        with patch(
+            'nameko.utils._parse_sensitive_arguments',
+            wraps=nameko.utils._parse_sensitive_arguments
+        ) as parse:
+            get_redacted_args(entrypoint, "A", "B")
+            assert get_redacted_args(entrypoint, "A", "B") == {
+                'a': REDACTED, 'b': "B"
+            }
+            assert parse.call_count == 1
+
+            # replacing the configuration is picked up by the next call
+            entrypoint.sensitive_arguments = ("b",)
+            assert get_redacted_args(entrypoint, "A", "B") == {
+                'a': "A", 'b': REDACTED
+            }
+            assert parse.call_count == 2
+
 
 class TestImportFromPath(object):
 
@@ -243,6 +376,25 @@ class TestImportFromPath(object):
     def test_import_function(self):
         assert import_from_path("nameko.rpc.rpc") is rpc
 
+    def test_import_nested_attribute(self):
+        assert import_from_path("nameko.rpc.Rpc.decorator") == Rpc.decorator
+
+    def test_import_builtin(self):
+        assert import_from_path("int") is int
+
+    def test_missing_attribute(self):
+        with pytest.raises(ImportError) as exc_info:
+            import_from_path("nameko.rpc.Missing")
+        assert (
+            "`nameko.rpc.Missing` could not be imported" in str(exc_info.value)
+        )
+
+    def test_attribute_is_none(self):
+        path = "nameko.extensions.Entrypoint.method_name"
+        with pytest.raises(ImportError) as exc_info:
+            import_from_path(path)
+        assert "`{}` could not be imported".format(path) in str(exc_info.value)
+
 
 @pytest.mark.parametrize('url,expected', [
     (
@@ -1,6 +1,8 @@
 import json
 
+import eventlet
 import pytest
+import requests
 from mock import patch
 from werkzeug.wrappers import Response
 
@@ -127,6 +129,32 @@ def test_bad_payload(web_session):
     assert "Error: TypeError: Payload must be a string. Got `23`" in rv.text
 
 
+def test_service_instantiation_error(
+    container_factory, web_config, web_config_port
+):
+
+    class BrokenService(object):
+        name = "brokenservice"
+
+        def __init__(self):
+            raise ValueError('oops')
+
+        @http('GET', '/method')
+        def method(self, request):
+            pass  # pragma: no cover
+
+    container = container_factory(BrokenService, web_config)
+    container.start()
+
+    with eventlet.Timeout(5):
+        rv = requests.get('http://127.0.0.1:{}/method'.format(web_config_port))
+    assert rv.status_code == 500
+    assert "ValueError: oops" in rv.text
+
+    # the container is still running
+    assert not container._died.ready()
+
+
 def test_lifecycle(container_factory, web_config):
 
     container = container_factory(SimpleService, web_config)
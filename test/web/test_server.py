@@ -1,13 +1,19 @@
 import socket
 
+import eventlet
 import pytest
 from eventlet import wsgi
-from mock import patch
+from eventlet.semaphore import Semaphore
+from mock import Mock, patch
+from werkzeug.exceptions import HTTPException, NotFound
+from werkzeug.routing import Map, Rule
+from werkzeug.test import EnvironBuilder
+from werkzeug.wrappers import Response
 
 from nameko.exceptions import ConfigurationError
 from nameko.web.handlers import HttpRequestHandler, http
 from nameko.web.server import (
-    BaseHTTPServer, HttpOnlyProtocol, WebServer, parse_address
+    BaseHTTPServer, HttpOnlyProtocol, WebServer, WsgiApp, parse_address
 )
 
 
@@ -127,6 +133,124 @@ def test_parse_address(source, result):
         assert parse_address(source) == result
 
 
+@pytest.mark.parametrize('dynamic', [False, True])
+@pytest.mark.parametrize('method, path', [
+    ('GET', '/missing'), ('GET', '/items'), ('GET', '/items/'),
+    ('POST', '/static'), ('GET', '//static'), ('GET', '/static/'),
+    ('GET', u'/caf\xc3\xa9'), ('GET', '/items/1'),
+])
+def test_unknown_paths_agree_with_url_map(dynamic, method, path):
+    endpoint = Mock()
+    rules = [
+        Rule('/static', methods=['GET'], endpoint=endpoint),
+        Rule('/items/', methods=['GET'], endpoint=endpoint),
+        Rule(u'/caf\xe9', methods=['GET'], endpoint=endpoint),
+    ]
+    if dynamic:
+        rules.append(Rule('/items/<int:pk>', methods=['GET'], endpoint=endpoint))
+    url_map = Map(rules)
+    app = WsgiApp(Mock(make_url_map=Mock(return_value=url_map)))
+    assert (app._known_paths is None) == dynamic
+
+    environ = EnvironBuilder(method=method).get_environ()
+    environ['PATH_INFO'] = path
+    try:
+        url_map.bind_to_environ(environ).match()
+    except HTTPException as exc:
+        expected = exc.code
+    else:
+        expected = 200
+    endpoint.handle_request.return_value = Response()
+
+    start_response = Mock()
+    app(environ, start_response)
+    (status, _), _ = start_response.call_args
+    assert int(status.split()[0]) == expected
+
+
+def test_bind_addr_is_cached_per_config_value():
+    server = WebServer()
+    server.container = Mock(config={'WEB_SERVER_ADDRESS': 'foo:8000'})
+
+    with patch('nameko.web.server.parse_address', wraps=parse_address) as parse:
+        assert server.bind_addr == ('foo', 8000)
+        assert server.bind_addr == ('foo', 8000)
+        assert parse.call_count == 1
+
+        server.container.config['WEB_SERVER_ADDRESS'] = '9000'
+        assert server.bind_addr == ('', 9000)
+        assert parse.call_count == 2
+
+
+def test_max_connections(
+    container_factory, web_config, web_config_port, web_session
+):
+    web_config['WEB_MAX_CONNECTIONS'] = 1
+
+    container = container_factory(ExampleService, web_config)
+    container.start()
+
+    # an idle connection occupies the only slot
+    idle = socket.create_connection(('127.0.0.1', web_config_port))
+    eventlet.sleep(0.1)
+
+    # further connections wait in the listen backlog
+    pending = eventlet.spawn(web_session.get, '/')
+    eventlet.sleep(0.1)
+    assert not pending.dead
+
+    idle.close()
+    with eventlet.Timeout(1):
+        assert pending.wait().status_code == 200
+
+
+@pytest.mark.parametrize('failure', ['accept', 'spawn'])
+def test_max_connections_permit_released_on_error(failure):
+    server = WebServer()
+    server.container = Mock()
+    server._connection_limiter = limiter = Semaphore(1)
+    server._sock = Mock()
+    server._sock.accept.return_value = (Mock(), ('127.0.0.1', 1234))
+    error = OSError('boom')
+    if failure == 'accept':
+        server._sock.accept.side_effect = error
+    else:
+        server.container.spawn_managed_thread.side_effect = error
+
+    with pytest.raises(OSError):
+        server.run()
+    assert limiter.balance == 1
+
+
+def test_max_connections_permit_released_when_killed_before_running():
+    server = WebServer()
+    server.container = Mock()
+    server._connection_limiter = limiter = Semaphore(2)
+    server._sock = Mock()
+    sock = Mock()
+    server._sock.accept.side_effect = [
+        (sock, ('127.0.0.1', 1234)), OSError('stop accepting')
+    ]
+
+    spawned = []
+
+    def spawn_managed_thread(fn):
+        spawned.append(eventlet.spawn(fn))
+        return spawned[-1]
+
+    server.container.spawn_managed_thread.side_effect = spawn_managed_thread
+
+    with pytest.raises(OSError):
+        server.run()
+    # the connection thread holds its permit until it exits
+    assert limiter.balance == 1
+
+    [gt] = spawned
+    gt.kill()
+    assert not sock.settimeout.called
+    assert limiter.balance == 2
+
+
 def test_adding_middleware_with_get_wsgi_app(container_factory, web_config):
 
     class CustomWebServer(WebServer):
@@ -191,3 +315,48 @@ def test_custom_wsgi_server_is_used(
     container.start()
 
     assert web_session.get('/').text == 'Override'
+
+
+def test_static_routes_agree_with_url_map():
+    index, item, post, redirect = Mock(), Mock(), Mock(), Mock()
+    cafe = Mock()
+    url_map = Map([
+        Rule('/items/<int:pk>', methods=['GET'], endpoint=item),
+        Rule('/caf\xe9', methods=['GET'], endpoint=cafe),
+        Rule('/items/new', methods=['GET'], endpoint=index),
+        Rule('/items/new', methods=['POST'], endpoint=post),
+        Rule('/old', methods=['GET'], endpoint=redirect, redirect_to='/new'),
+        Rule('/any', endpoint=index),
+    ])
+    server = Mock(make_url_map=Mock(return_value=url_map))
+    app = WsgiApp(server)
+
+    # only plain static rules with explicit methods get a fast path
+    assert app._static_routes == {
+        ('GET', '/items/new'): index,
+        ('HEAD', '/items/new'): index,
+        ('POST', '/items/new'): post,
+        # keys are in WSGI form, i.e. UTF-8 bytes decoded as latin-1
+        ('GET', '/caf\xc3\xa9'): cafe,
+        ('HEAD', '/caf\xc3\xa9'): cafe,
+    }
+
+    for method, path in [
+        ('GET', '/items/new'), ('HEAD', '/items/new'), ('POST', '/items/new'),
+        ('get', '/items/new'), ('GET', '/items/1'), ('GET', '/caf\xe9'),
+    ]:
+        environ = EnvironBuilder(path=path, method=method).get_environ()
+        provider, values = url_map.bind_to_environ(environ).match()
+        app(environ, Mock())
+        assert provider.handle_request.call_args[0][0].path_values == values
+        provider.handle_request.reset_mock()
+
+    # a raw latin-1 ``%E9`` is not the UTF-8 encoded rule and must 404
+    environ = EnvironBuilder(path='/', method='GET').get_environ()
+    environ['PATH_INFO'] = '/caf\xe9'
+    with pytest.raises(NotFound):
+        url_map.bind_to_environ(environ).match()
+    start_response = Mock()
+    app(environ, start_response)
+    assert start_response.call_args[0][0].startswith('404')
+    assert not cafe.handle_request.called
@@ -1,6 +1,8 @@
+import datetime
 import errno
 import json
 import socket
+import uuid
 
 import eventlet
 import pytest
@@ -11,7 +13,10 @@ from nameko.exceptions import (
 )
 from nameko.testing.services import dummy, entrypoint_hook, get_extension
 from nameko.testing.websocket import make_virtual_socket
-from nameko.web.websocket import WebSocketHubProvider, rpc
+from nameko.web.websocket import (
+    SocketInfo, WebSocketHub, WebSocketHubProvider, WebSocketRpc,
+    WebSocketServer, rpc
+)
 
 
 class ExampleService(object):
@@ -156,6 +161,26 @@ def test_method_not_found(container, websocket):
         ws.rpc('unknown')
 
 
+def test_get_provider_for_method():
+    server = WebSocketServer()
+
+    provider = WebSocketRpc()
+    provider.method_name = 'spam'
+    hub_provider = WebSocketHubProvider()
+
+    server.register_provider(provider)
+    server.register_provider(hub_provider)
+    assert server.get_provider_for_method('spam') is provider
+
+    for method in ('ham', ['spam']):
+        with pytest.raises(MethodNotFound):
+            server.get_provider_for_method(method)
+
+    server.unregister_provider(provider)
+    with pytest.raises(MethodNotFound):
+        server.get_provider_for_method('spam')
+
+
 def test_list_subscriptions(container, websocket):
     ws = websocket()
     assert ws.rpc('list_subscriptions') == []
@@ -172,6 +197,13 @@ def test_unicast(container, websocket):
     assert get_message(ws) == 42
 
 
+def test_socket_id_is_uuid4(container, websocket):
+    ws = websocket()
+    _, connected_data = ws.wait_for_event('connected')
+    socket_id = connected_data['socket_id']
+    assert str(uuid.UUID(socket_id, version=4)) == socket_id
+
+
 def test_unicast_unknown(container):
     with entrypoint_hook(container, 'unicast') as unicast:
         assert not unicast(target_socket_id=0, value=42)
@@ -213,6 +245,67 @@ def test_badly_encoded_data(container, web_config_port):
     gt.kill()
 
 
+@pytest.mark.parametrize('payload', [
+    {'type': 'result', 'data': [1, 'two', None, True, 1.5]},
+    {1: 'non-string keys'},
+    {'big': 2 ** 70},
+    {'text': u'caf\xe9 \u2603'},
+])
+def test_ws_json_round_trip(payload):
+    server = WebSocketServer()
+
+    # byte-for-byte what the standard library produces
+    assert server.serialize_for_ws(payload) == json.dumps(payload)
+
+    expected = json.loads(json.dumps(payload))
+    request = json.dumps({'method': 'spam', 'data': payload})
+    assert server.deserialize_ws_frame(request) == ('spam', expected, None)
+
+
+@pytest.mark.parametrize('payload', [
+    {'when': datetime.datetime(2020, 1, 1)},
+    {'id': uuid.UUID(int=0)},
+])
+def test_ws_serialization_rejects_non_json_types(payload):
+    server = WebSocketServer()
+
+    with pytest.raises(TypeError):
+        server.serialize_for_ws(payload)
+
+
+def test_ws_frame_accepts_stdlib_json_extensions():
+    server = WebSocketServer()
+
+    _, data, _ = server.deserialize_ws_frame(
+        '{"method": "spam", "data": {"value": NaN}}'
+    )
+    assert data['value'] != data['value']
+
+
+def test_broadcast_tolerates_unsubscribe_during_send():
+    server = WebSocketServer()
+    hub = WebSocketHub(server)
+    sent = []
+
+    class Socket(object):
+        def __init__(self, socket_id):
+            self.socket_id = socket_id
+
+        def send(self, payload):
+            # sending may yield to a thread that changes the subscriptions
+            if not sent:
+                hub.unsubscribe(self.socket_id, 'channel')
+            sent.append(self.socket_id)
+
+    for socket_id in ('a', 'b', 'c'):
+        server.sockets[socket_id] = SocketInfo(Socket(socket_id), {})
+        hub.subscribe(socket_id, 'channel')
+
+    hub.broadcast('channel', 'event', {})
+    # the broadcast goes to the subscribers at the time it was made
+    assert sorted(sent) == ['a', 'b', 'c']
+
+
 def test_websocket_helper_error(websocket):
     with pytest.raises(socket.error) as exc:
         websocket()